@@ -0,0 +1,142 @@
+"""Admission control for expensive endpoints.
+
+Each group of expensive routes gets a concurrency limit and a bounded wait
+queue. Requests beyond both are rejected at once with ``Retry-After`` instead
+of piling up and exhausting memory, file descriptors or GitHub quota. Routes
+outside every group (health probes, the card catalog) bypass admission
+entirely, so they keep answering while expensive routes are saturated.
+"""
+import asyncio
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class RouteGroup:
+    """Concurrency limit and bounded wait queue shared by a set of routes"""
+
+    def __init__(
+        self,
+        name: str,
+        routes: List[Tuple[str, str]],
+        limit: int,
+        max_queue: int,
+        max_wait: float,
+        retry_after: int,
+    ):
+        self.name = name
+        self.routes = routes
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.retry_after = retry_after
+
+        self.active = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def matches(self, method: str, path: str) -> bool:
+        return any(
+            (route_method == "*" or route_method == method) and path.startswith(prefix)
+            for route_method, prefix in self.routes
+        )
+
+    async def acquire(self) -> Optional[int]:
+        """Take a slot, or return the HTTP status to reject with"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limit)
+        if self.active < self.limit and not self.queued:
+            await self._semaphore.acquire()
+        else:
+            if self.queued >= self.max_queue:
+                self.rejected_queue_full += 1
+                return 429
+            self.queued += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.max_wait)
+            except asyncio.TimeoutError:
+                self.rejected_timeout += 1
+                return 503
+            finally:
+                self.queued -= 1
+        self.active += 1
+        self.admitted += 1
+        return None
+
+    def release(self) -> None:
+        self.active -= 1
+        self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+        }
+
+
+def route_group_from_env(
+    name: str,
+    routes: List[Tuple[str, str]],
+    limit: int,
+    max_queue: int,
+    max_wait: float = 10.0,
+    retry_after: int = 5,
+) -> RouteGroup:
+    """Build a group whose defaults can be overridden with ADMISSION_<NAME>_* variables"""
+    prefix = f"ADMISSION_{name.upper()}_"
+    return RouteGroup(
+        name,
+        routes,
+        limit=int(os.getenv(prefix + "LIMIT", str(limit))),
+        max_queue=int(os.getenv(prefix + "QUEUE", str(max_queue))),
+        max_wait=float(os.getenv(prefix + "MAX_WAIT", str(max_wait))),
+        retry_after=int(os.getenv(prefix + "RETRY_AFTER", str(retry_after))),
+    )
+
+
+class AdmissionControlMiddleware:
+    """ASGI middleware holding a group slot for the whole request, including streamed bodies"""
+
+    def __init__(self, app, groups: List[RouteGroup]):
+        self.app = app
+        self.groups = groups
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        group = next((g for g in self.groups if g.matches(scope["method"], scope["path"])), None)
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        rejected = await group.acquire()
+        if rejected is not None:
+            await self._reject(send, rejected, group)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            group.release()
+
+    async def _reject(self, send, status: int, group: RouteGroup) -> None:
+        body = json.dumps({"detail": f"Too many concurrent {group.name} requests, retry later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(group.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
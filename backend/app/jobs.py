@@ -0,0 +1,301 @@
+"""Durable background job queue for GitHub writes.
+
+Jobs are persisted in SQLite so that queued or interrupted work survives a
+restart. Workers pick the highest priority job that is due, but jobs for the
+same repository run in the order they were enqueued, at most
+``per_repo_limit`` at a time. A job waiting on retry backoff holds back later
+jobs for its repository, so an older write never lands after a newer one.
+Finished jobs are kept for ``retention`` seconds so clients can poll their
+result, then deleted by the workers.
+"""
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+PRIORITIES = {
+    "interactive": 0,
+    "bulk": 10,
+}
+
+
+class RetryableJobError(Exception):
+    """Raised by a job handler when the failure is transient and worth retrying"""
+
+
+JobHandler = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+class JobQueue:
+    """SQLite-backed priority queue with a pool of worker threads"""
+
+    def __init__(
+        self,
+        db_path: str,
+        workers: int = 4,
+        per_repo_limit: int = 1,
+        max_attempts: int = 5,
+        backoff_base: float = 2.0,
+        backoff_max: float = 300.0,
+        poll_interval: float = 1.0,
+        retention: Optional[float] = 7 * 24 * 3600,
+        purge_interval: float = 3600.0,
+    ):
+        self.db_path = db_path
+        self.workers = workers
+        self.per_repo_limit = per_repo_limit
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.purge_interval = purge_interval
+
+        self._handlers: Dict[str, JobHandler] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._threads: List[threading.Thread] = []
+        self._stopping = False
+        self._conn: Optional[sqlite3.Connection] = None
+        self._purged_at = 0.0
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self._handlers[kind] = handler
+
+    def start(self) -> None:
+        """Open the store, requeue interrupted jobs and start the workers"""
+        if self._threads:
+            return
+        self._open()
+        with self._lock:
+            self._stopping = False
+            # Jobs left "running" were interrupted by a crash or restart.
+            self._conn.execute(
+                "UPDATE jobs SET status = 'queued', updated_at = ? WHERE status = 'running'",
+                (time.time(),),
+            )
+            self._conn.commit()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        with self._lock:
+            self._stopping = True
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        repo: str,
+        priority: str = "interactive",
+        dedupe: bool = False,
+    ) -> str:
+        """Persist a job and return its ID immediately.
+
+        With `dedupe`, a job of the same kind already queued for the repo is
+        reused instead, and its ID returned.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if priority not in PRIORITIES:
+            raise ValueError(f"Invalid priority: {priority}")
+        self._open()
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            if dedupe:
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE repo = ? AND status = 'queued' AND kind = ? LIMIT 1",
+                    (repo, kind),
+                ).fetchone()
+                if row is not None:
+                    return row[0]
+            self._conn.execute(
+                """INSERT INTO jobs (id, kind, repo, priority, status, payload, attempts,
+                                     run_at, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, 'queued', ?, 0, ?, ?, ?)""",
+                (job_id, kind, repo, PRIORITIES[priority], json.dumps(payload), now, now, now),
+            )
+            self._conn.commit()
+            self._wakeup.notify()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the public view of a job (never includes the payload)"""
+        self._open()
+        with self._lock:
+            row = self._conn.execute(
+                """SELECT id, kind, repo, priority, status, attempts, result, error,
+                          created_at, updated_at
+                   FROM jobs WHERE id = ?""",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        priority_name = next((k for k, v in PRIORITIES.items() if v == row[3]), str(row[3]))
+        return {
+            "job_id": row[0],
+            "kind": row[1],
+            "repo": row[2],
+            "priority": priority_name,
+            "status": row[4],
+            "attempts": row[5],
+            "result": json.loads(row[6]) if row[6] else None,
+            "error": row[7],
+            "created_at": row[8],
+            "updated_at": row[9],
+        }
+
+    def purge(self, older_than: float) -> int:
+        """Delete finished jobs last updated more than `older_than` seconds ago"""
+        self._open()
+        with self._lock:
+            return self._purge(older_than)
+
+    def _purge(self, older_than: float) -> int:
+        cursor = self._conn.execute(
+            "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND updated_at < ?",
+            (time.time() - older_than,),
+        )
+        self._conn.commit()
+        self._purged_at = time.time()
+        return cursor.rowcount
+
+    def _open(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                return
+            directory = os.path.dirname(os.path.abspath(self.db_path))
+            os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                       id TEXT PRIMARY KEY,
+                       kind TEXT NOT NULL,
+                       repo TEXT NOT NULL,
+                       priority INTEGER NOT NULL,
+                       status TEXT NOT NULL,
+                       payload TEXT,
+                       attempts INTEGER NOT NULL,
+                       run_at REAL NOT NULL,
+                       result TEXT,
+                       error TEXT,
+                       created_at REAL NOT NULL,
+                       updated_at REAL NOT NULL
+                   )"""
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, priority, run_at, created_at)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_by_repo ON jobs (repo, status)")
+            self._conn.commit()
+            # Payloads carry GitHub tokens until the job finishes.
+            try:
+                os.chmod(self.db_path, 0o600)
+            except OSError:
+                pass
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        """Take the next due job that is among the oldest unfinished jobs of its repo"""
+        row = self._conn.execute(
+            """SELECT j.id, j.kind, j.repo, j.payload, j.attempts FROM jobs j
+               WHERE j.status = 'queued' AND j.run_at <= ?
+                 AND (SELECT COUNT(*) FROM jobs e
+                      WHERE e.repo = j.repo AND e.status IN ('queued', 'running')
+                        AND e.rowid < j.rowid) < ?
+               ORDER BY j.priority, j.run_at, j.created_at
+               LIMIT 1""",
+            (time.time(), self.per_repo_limit),
+        ).fetchone()
+        if row is None:
+            return None
+        self._conn.execute(
+            "UPDATE jobs SET status = 'running', updated_at = ? WHERE id = ?",
+            (time.time(), row[0]),
+        )
+        self._conn.commit()
+        return {
+            "id": row[0],
+            "kind": row[1],
+            "repo": row[2],
+            "payload": json.loads(row[3]) if row[3] else {},
+            "attempts": row[4],
+        }
+
+    def _next_due_in(self) -> float:
+        row = self._conn.execute(
+            "SELECT MIN(run_at) FROM jobs WHERE status = 'queued'"
+        ).fetchone()
+        if row is None or row[0] is None:
+            return self.poll_interval
+        return max(0.0, min(self.poll_interval, row[0] - time.time()))
+
+    def _worker(self) -> None:
+        while True:
+            with self._lock:
+                job = None
+                while not self._stopping:
+                    if self.retention is not None and time.time() - self._purged_at >= self.purge_interval:
+                        self._purge(self.retention)
+                    job = self._claim()
+                    if job is not None:
+                        break
+                    self._wakeup.wait(timeout=self._next_due_in() or self.poll_interval)
+                if self._stopping:
+                    return
+            self._run(job)
+
+    def _run(self, job: Dict[str, Any]) -> None:
+        attempts = job["attempts"] + 1
+        handler = self._handlers.get(job["kind"])
+        status, result, error, run_at = "succeeded", None, None, time.time()
+        try:
+            if handler is None:
+                raise ValueError(f"No handler registered for job kind: {job['kind']}")
+            result = handler(job["payload"])
+        except RetryableJobError as e:
+            error = str(e)
+            if attempts < self.max_attempts:
+                status = "queued"
+                delay = min(self.backoff_max, self.backoff_base * (2 ** (attempts - 1)))
+                run_at += delay * random.uniform(0.5, 1.0)
+            else:
+                status = "failed"
+        except Exception as e:
+            status, error = "failed", str(e)
+
+        with self._lock:
+            if self._conn is None:
+                return
+            if status == "queued":
+                self._conn.execute(
+                    """UPDATE jobs SET status = ?, attempts = ?, error = ?, run_at = ?, updated_at = ?
+                       WHERE id = ?""",
+                    (status, attempts, error, run_at, time.time(), job["id"]),
+                )
+            else:
+                # Drop the payload (and the token in it) once the job is final.
+                self._conn.execute(
+                    """UPDATE jobs SET status = ?, attempts = ?, result = ?, error = ?, payload = NULL,
+                                       updated_at = ?
+                       WHERE id = ?""",
+                    (status, attempts, json.dumps(result) if result is not None else None, error,
+                     time.time(), job["id"]),
+                )
+            self._conn.commit()
+            self._wakeup.notify_all()
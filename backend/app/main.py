@@ -1,17 +1,109 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from functools import lru_cache
 from pydantic import BaseModel
-import psycopg
 import requests
 import base64
-import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Union
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
+from app.admission import AdmissionControlMiddleware, route_group_from_env
+from app.jobs import JobQueue, RetryableJobError
+from app.repo_metadata import RepoMetadata, RepoMetadataCache
+from app.responses import FastJSONResponse, dumps
+from app.run_history import RunHistory
+from app.run_logs import RunLogCache, download_to, iter_log_lines, select_log_files
+from app.secret_sync import FingerprintStore, SecretTarget, is_unchanged
+from app.workflows import AGENT_WORKFLOWS, WorkflowOptions, encoded_workflow
+
 load_dotenv()
 
-app = FastAPI()
+# Default location of the app's local stores; each can be moved with its own variable.
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+job_queue = JobQueue(
+    db_path=os.getenv("JOBS_DB_PATH", os.path.join(DATA_DIR, "jobs.sqlite3")),
+    workers=int(os.getenv("JOBS_WORKERS", "4")),
+    per_repo_limit=int(os.getenv("JOBS_PER_REPO_LIMIT", "1")),
+    max_attempts=int(os.getenv("JOBS_MAX_ATTEMPTS", "5")),
+    retention=float(os.getenv("JOBS_RETENTION_SECONDS", str(7 * 24 * 3600))),
+)
+
+run_log_cache = RunLogCache(
+    directory=os.getenv("RUN_LOG_CACHE_DIR", os.path.join(DATA_DIR, "run-logs")),
+    max_bytes=int(os.getenv("RUN_LOG_CACHE_MAX_BYTES", str(512 * 1024 * 1024))),
+)
+
+run_history = RunHistory(
+    db_path=os.getenv("RUN_HISTORY_DB_PATH", os.path.join(DATA_DIR, "run-history.sqlite3")),
+)
+RUN_HISTORY_SYNC_INTERVAL = float(os.getenv("RUN_HISTORY_SYNC_INTERVAL", "60"))
+
+secret_fingerprints = FingerprintStore(
+    db_path=os.getenv("SECRET_FINGERPRINT_DB_PATH", os.path.join(DATA_DIR, "secret-fingerprints.sqlite3")),
+    key=os.getenv("SECRET_FINGERPRINT_KEY"),
+)
+
+# Shared connection pool for GitHub API calls from request handlers and job workers.
+github_session = requests.Session()
+github_session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=32))
+
+warmup_done = threading.Event()
+
+def warm_up():
+    """Prepare caches, stores and connections so the first real requests are fast"""
+    try:
+        build_catalog_responses()
+        run_history.open()
+        secret_fingerprints.open()
+        os.makedirs(run_log_cache.directory, exist_ok=True)
+        try:
+            load_crypto()
+        except ImportError:
+            pass
+        if os.getenv("WARMUP_GITHUB_CONNECTION", "true").lower() == "true":
+            try:
+                github_session.head("https://api.github.com", timeout=2)
+            except requests.RequestException:
+                pass
+    finally:
+        warmup_done.set()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    job_queue.start()
+    # Warm up off the startup path: liveness passes at once, readiness once this is done.
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    yield
+    job_queue.stop()
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+
+# Expensive routes are admitted per group; anything not listed (health
+# probes, the card catalog, job status) is never queued or shed.
+admission_groups = [
+    route_group_from_env("teams_build", [("POST", "/api/teams/build")], limit=1, max_queue=2, retry_after=60),
+    route_group_from_env(
+        "packaging",
+        [
+            ("POST", "/api/teams/package"),
+            ("GET", "/api/teams/download"),
+            ("POST", "/api/copilot/package"),
+            ("GET", "/api/copilot/download"),
+            ("GET", "/api/copilot-extension/download"),
+        ],
+        limit=2,
+        max_queue=8,
+        retry_after=10,
+    ),
+    route_group_from_env("github", [("*", "/api/github/")], limit=16, max_queue=64),
+]
+app.add_middleware(AdmissionControlMiddleware, groups=admission_groups)
 
 # Disable CORS. Do not remove this for full-stack development.
 app.add_middleware(
@@ -27,122 +119,186 @@ class WorkflowRequest(BaseModel):
     github_token: str
     task: str
     agent_type: str = "codex"
+    options: WorkflowOptions = WorkflowOptions()
+    background: bool = False
+    priority: str = "interactive"
 
 class SecretsRequest(BaseModel):
     repo_name: str
     github_token: str
     secrets: Dict[str, str]
+    background: bool = False
+    priority: str = "interactive"
+
+class RepoMetadataRequest(BaseModel):
+    github_token: str
+    repos: List[str]
+    refresh: bool = False
+
+class SecretsSyncRequest(BaseModel):
+    github_token: str
+    secrets: Dict[str, str]
+    targets: List[SecretTarget]
+    force: bool = False
+    background: bool = False
+    priority: str = "bulk"
 
 class TriggerWorkflowRequest(BaseModel):
     repo_name: str
     github_token: str
     task: str
+    background: bool = False
+    priority: str = "interactive"
 
-CODEX_WORKFLOW_TEMPLATE = """name: Codex CLI Agent
-on:
-  workflow_dispatch:
-    inputs:
-      task:
-        description: 'Task description'
-        required: true
-        type: string
-
-jobs:
-  codex_refactor:
-    runs-on: ubuntu-latest
-    steps:
-      - uses: actions/checkout@v4
-      - name: Run Codex agent
-        run: |
-          npm install -g @openai/codex
-          export AZURE_OPENAI_API_KEY=${{ secrets.AZURE_OPENAI_API_KEY }}
-          export OPENAI_API_KEY=${{ secrets.AZURE_OPENAI_API_KEY }}
-          codex -p azure "${{ github.event.inputs.task }}"
-"""
+class StatusResponse(BaseModel):
+    status: str
 
-GITHUB_COPILOT_WORKFLOW_TEMPLATE = """name: GitHub Copilot Agent
-on:
-  workflow_dispatch:
-    inputs:
-      task:
-        description: 'Task description'
-        required: true
-        type: string
-
-jobs:
-  copilot_task:
-    runs-on: ubuntu-latest
-    steps:
-      - uses: actions/checkout@v4
-      - name: Setup Node.js
-        uses: actions/setup-node@v4
-        with:
-          node-version: '18'
-      - name: Install GitHub Copilot CLI
-        run: |
-          npm install -g @githubnext/github-copilot-cli
-      - name: Run GitHub Copilot task
-        env:
-          GITHUB_TOKEN: ${{ secrets.GITHUB_TOKEN }}
-        run: |
-          echo "Running GitHub Copilot with task: ${{ github.event.inputs.task }}"
-          github-copilot-cli "${{ github.event.inputs.task }}"
-"""
+class StatusMessageResponse(BaseModel):
+    status: str
+    message: str
 
-DEVIN_WORKFLOW_TEMPLATE = """name: Devin Agent
-on:
-  workflow_dispatch:
-    inputs:
-      task:
-        description: 'Task description'
-        required: true
-        type: string
-
-jobs:
-  devin_task:
-    runs-on: ubuntu-latest
-    steps:
-      - uses: actions/checkout@v4
-      - name: Setup Python
-        uses: actions/setup-python@v4
-        with:
-          python-version: '3.11'
-      - name: Run Devin agent
-        env:
-          DEVIN_API_KEY: ${{ secrets.DEVIN_API_KEY }}
-        run: |
-          echo "Running Devin with task: ${{ github.event.inputs.task }}"
-          curl -X POST "https://api.devin.ai/v1/sessions" \
-            -H "Authorization: Bearer $DEVIN_API_KEY" \
-            -H "Content-Type: application/json" \
-            -d "{\"task\": \"${{ github.event.inputs.task }}\", \"repo_url\": \"${{ github.server_url }}/${{ github.repository }}\"}"
-"""
+class AdmissionGroupStats(BaseModel):
+    limit: int
+    max_queue: int
+    active: int
+    queued: int
+    admitted: int
+    rejected_queue_full: int
+    rejected_timeout: int
 
-REPLIT_WORKFLOW_TEMPLATE = """name: Replit Agent
-on:
-  workflow_dispatch:
-    inputs:
-      task:
-        description: 'Task description'
-        required: true
-        type: string
-
-jobs:
-  replit_task:
-    runs-on: ubuntu-latest
-    steps:
-      - uses: actions/checkout@v4
-      - name: Setup Node.js
-        uses: actions/setup-node@v4
-        with:
-          node-version: '18'
-      - name: Run Replit Agent
-        env:
-          REPLIT_TOKEN: ${{ secrets.REPLIT_TOKEN }}
-        run: |
-          echo "Running Replit Agent with task: ${{ github.event.inputs.task }}"
-          npx @replit/agent-cli run --task "${{ github.event.inputs.task }}" --token "$REPLIT_TOKEN"
-"""
+class CardButton(BaseModel):
+    label: str
+    variant: str
+    url: Optional[str] = None
+    action: Optional[str] = None
+
+class CardModal(BaseModel):
+    title: str
+    content: str
+
+class Card(BaseModel):
+    id: int
+    title: str
+    description: str
+    url: str
+    category: str
+    features: List[str]
+    video_placeholder: str
+    icon: str
+    buttons: Optional[List[CardButton]] = None
+    modal: Optional[CardModal] = None
+
+class ErrorResponse(BaseModel):
+    error: str
+
+class JobQueuedResponse(BaseModel):
+    status: str
+    job_id: str
+    job_url: str
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    kind: str
+    repo: str
+    priority: str
+    status: str
+    attempts: int
+    result: Optional[Dict[str, Any]]
+    error: Optional[str]
+    created_at: float
+    updated_at: float
+
+class WorkflowCreatedResponse(BaseModel):
+    status: str
+    workflow_url: str
+    message: str
+
+class SecretsResponse(BaseModel):
+    status: str
+    results: Dict[str, str]
+
+class SecretTargetSyncResult(BaseModel):
+    target: str
+    written: int
+    skipped: int
+    failed: int
+    results: Dict[str, str]
+    error: Optional[str] = None
+
+class SecretsSyncResponse(BaseModel):
+    status: str
+    written: int
+    skipped: int
+    failed: int
+    targets: List[SecretTargetSyncResult]
+
+class RepoMetadataResponse(BaseModel):
+    repos: Dict[str, RepoMetadata]
+
+class JobsQueuedResponse(BaseModel):
+    status: str
+    jobs: List[JobQueuedResponse]
+
+class WorkflowTriggeredResponse(BaseModel):
+    status: str
+    run_id: str
+    message: str
+
+class WorkflowRunResponse(BaseModel):
+    status: str
+    progress: str
+    conclusion: Optional[str] = None
+    logs: Optional[str] = None
+
+class RunRecord(BaseModel):
+    run_id: int
+    agent_type: str
+    status: Optional[str]
+    conclusion: Optional[str]
+    created_at: Optional[str]
+    run_started_at: Optional[str]
+    updated_at: Optional[str]
+    duration: Optional[float]
+    queue_time: Optional[float]
+    html_url: Optional[str]
+    run_attempt: Optional[int] = None
+
+class RunPage(BaseModel):
+    runs: List[RunRecord]
+    next_cursor: Optional[str]
+    synced_at: Optional[float] = None
+    sync_job_id: Optional[str] = None
+
+class AgentRunStats(BaseModel):
+    completed_runs: int
+    success_rate: Optional[float]
+    duration_p50_seconds: Optional[float]
+    duration_p95_seconds: Optional[float]
+    queue_time_p50_seconds: Optional[float]
+    queue_time_p95_seconds: Optional[float]
+
+class RunStatsResponse(BaseModel):
+    repo: str
+    agents: Dict[str, AgentRunStats]
+    synced_at: Optional[float] = None
+    sync_job_id: Optional[str] = None
+
+class TeamsBuildResponse(BaseModel):
+    status: str
+    message: str
+    output: str
+
+class PackageResponse(BaseModel):
+    status: str
+    message: str
+    package_path: str
+
+class TeamsAppResponse(BaseModel):
+    status: str
+    message: Optional[str] = None
+    port: Optional[int] = None
+    devtools_url: Optional[str] = None
+    process_id: Optional[int] = None
 
 cards_data = [
     {
@@ -284,151 +440,486 @@ cards_data = [
     }
 ]
 
-@app.get("/healthz")
+# The catalog is static, so its JSON bodies are serialized once and reused.
+catalog_responses: Dict[str, bytes] = {}
+
+def build_catalog_responses() -> Dict[str, bytes]:
+    if not catalog_responses:
+        responses = {
+            "cards": dumps(cards_data),
+            "categories": dumps(sorted(set(card["category"] for card in cards_data)))
+        }
+        for card in cards_data:
+            responses[f"card:{card['id']}"] = dumps(card)
+        catalog_responses.update(responses)
+    return catalog_responses
+
+@lru_cache(maxsize=None)
+def load_crypto():
+    """Import cryptography on first use only; it is slow to import and rarely needed"""
+    from cryptography.hazmat.primitives import serialization, hashes
+    from cryptography.hazmat.primitives.asymmetric import padding, rsa
+    return serialization, hashes, padding, rsa
+
+@app.get("/healthz", response_model=StatusResponse)
 async def healthz():
     return {"status": "ok"}
 
-@app.get("/api/cards")
-async def get_cards() -> List[Dict[str, Any]]:
+@app.get("/readyz", response_model=StatusResponse, responses={503: {"model": StatusResponse}})
+async def readyz():
+    """Readiness probe: succeeds once startup warm-up has finished"""
+    if not warmup_done.is_set():
+        return Response(content=b'{"status":"warming_up"}', status_code=503, media_type="application/json")
+    return {"status": "ready"}
+
+@app.get("/api/admission/stats", response_model=Dict[str, AdmissionGroupStats])
+async def get_admission_stats():
+    """Active requests, queue depth and rejection counts per route group"""
+    return {group.name: group.stats() for group in admission_groups}
+
+@app.get("/api/cards", response_model=List[Card])
+async def get_cards() -> Response:
     """Get all integration cards data"""
-    return cards_data
+    return Response(content=build_catalog_responses()["cards"], media_type="application/json")
 
-@app.get("/api/cards/{card_id}")
-async def get_card(card_id: int) -> Dict[str, Any]:
+@app.get("/api/cards/{card_id}", response_model=Union[Card, ErrorResponse])
+async def get_card(card_id: int) -> Response:
     """Get specific card data by ID"""
-    card = next((card for card in cards_data if card["id"] == card_id), None)
-    if not card:
-        return {"error": "Card not found"}
-    return card
+    card = build_catalog_responses().get(f"card:{card_id}")
+    if card is None:
+        return Response(content=b'{"error":"Card not found"}', media_type="application/json")
+    return Response(content=card, media_type="application/json")
 
-@app.get("/api/categories")
-async def get_categories() -> List[str]:
+@app.get("/api/categories", response_model=List[str])
+async def get_categories() -> Response:
     """Get all unique categories"""
-    categories = list(set(card["category"] for card in cards_data))
-    return sorted(categories)
+    return Response(content=build_catalog_responses()["categories"], media_type="application/json")
 
-@app.post("/api/github/workflows")
-async def create_workflow(request: WorkflowRequest):
-    try:
-        headers = {
-            "Authorization": f"token {request.github_token}",
-            "Accept": "application/vnd.github.v3+json"
-        }
-        
-        workflow_templates = {
-            "codex": CODEX_WORKFLOW_TEMPLATE,
-            "github_copilot": GITHUB_COPILOT_WORKFLOW_TEMPLATE,
-            "devin": DEVIN_WORKFLOW_TEMPLATE,
-            "replit": REPLIT_WORKFLOW_TEMPLATE
-        }
-        
-        if request.agent_type not in workflow_templates:
-            raise HTTPException(status_code=400, detail=f"Invalid agent type: {request.agent_type}")
-        
-        workflow_template = workflow_templates[request.agent_type]
-        workflow_content = base64.b64encode(workflow_template.encode()).decode()
-        
-        agent_names = {
-            "codex": "Codex CLI",
-            "github_copilot": "GitHub Copilot",
-            "devin": "Devin",
-            "replit": "Replit Agent"
-        }
+def github_headers(github_token: str) -> Dict[str, str]:
+    return {
+        "Authorization": f"token {github_token}",
+        "Accept": "application/vnd.github.v3+json"
+    }
+
+def is_transient_github_error(response: requests.Response) -> bool:
+    """Whether a failed GitHub call is worth retrying (throttling or server errors)"""
+    if response.status_code == 429 or response.status_code >= 500:
+        return True
+    return response.status_code == 403 and response.headers.get("X-RateLimit-Remaining") == "0"
+
+REPO_METADATA_FIELDS = """
+    isArchived
+    viewerPermission
+    defaultBranchRef { name }
+    workflows: object(expression: "HEAD:.github/workflows") {
+      ... on Tree { entries { name oid } }
+    }
+"""
+
+def fetch_repo_metadata(github_token: str, repo_names: List[str]) -> Dict[str, RepoMetadata]:
+    """Look up many repositories in a single GraphQL query"""
+    now = time.time()
+    results = {}
+    variables = {}
+    declarations = []
+    fields = []
+    for i, repo_name in enumerate(repo_names):
+        owner, _, name = repo_name.partition("/")
+        if not owner or not name or "/" in name:
+            results[repo_name] = RepoMetadata(repo_name=repo_name, accessible=False, fetched_at=now)
+            continue
+        variables[f"o{i}"], variables[f"n{i}"] = owner, name
+        declarations.append(f"$o{i}: String!, $n{i}: String!")
+        fields.append(f"r{i}: repository(owner: $o{i}, name: $n{i}) {{{REPO_METADATA_FIELDS}}}")
+    
+    if fields:
+        query = "query(" + ", ".join(declarations) + ") {\n" + "\n".join(fields) + "\n}"
+        response = github_session.post(
+            "https://api.github.com/graphql",
+            headers=github_headers(github_token),
+            json={"query": query, "variables": variables}
+        )
+        if response.status_code != 200:
+            if is_transient_github_error(response):
+                raise RetryableJobError("Repository metadata lookup failed")
+            raise HTTPException(status_code=400, detail=f"Repository metadata lookup failed: {response.text}")
         
-        agent_name = agent_names[request.agent_type]
-        filename = f"{request.agent_type.replace('_', '-')}-workflow.yml"
+        body = response.json()
+        data = body.get("data") or {}
+        error_types = {}
+        for error in body.get("errors") or []:
+            if error.get("path"):
+                error_types.setdefault(error["path"][0], error.get("type"))
+        for i, repo_name in enumerate(repo_names):
+            if repo_name in results:
+                continue
+            repo = data.get(f"r{i}")
+            if repo is None:
+                # Only a definite "missing or forbidden" is cached; rate limiting
+                # or a partial response must not mark the repository inaccessible.
+                if error_types.get(f"r{i}") not in ("NOT_FOUND", "FORBIDDEN"):
+                    raise RetryableJobError(f"Repository metadata lookup failed for {repo_name}")
+                results[repo_name] = RepoMetadata(repo_name=repo_name, accessible=False, fetched_at=now)
+                continue
+            workflows = repo.get("workflows") or {}
+            results[repo_name] = RepoMetadata(
+                repo_name=repo_name,
+                accessible=True,
+                default_branch=(repo.get("defaultBranchRef") or {}).get("name"),
+                archived=repo["isArchived"],
+                permission=repo.get("viewerPermission"),
+                workflow_files={entry["name"]: entry["oid"] for entry in workflows.get("entries", [])},
+                fetched_at=now
+            )
+    return results
+
+repo_metadata = RepoMetadataCache(
+    fetch=fetch_repo_metadata,
+    ttl=float(os.getenv("REPO_METADATA_TTL", "300")),
+    batch_size=int(os.getenv("REPO_METADATA_BATCH_SIZE", "50")),
+)
+
+# Seconds clients are asked to wait when GitHub throttles or fails a metadata lookup.
+GITHUB_UNAVAILABLE_RETRY_AFTER = 30
+
+def github_unavailable(error: RetryableJobError) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=str(error),
+        headers={"Retry-After": str(GITHUB_UNAVAILABLE_RETRY_AFTER)},
+    )
+
+def lookup_repo(github_token: str, repo_name: str, refresh: bool = False) -> RepoMetadata:
+    try:
+        return repo_metadata.get(github_token, repo_name, refresh=refresh)
+    except RetryableJobError as e:
+        raise github_unavailable(e)
+
+def require_readable_repo(github_token: str, repo_name: str) -> RepoMetadata:
+    """Check the token can see the repository before serving anything cached for it"""
+    metadata = lookup_repo(github_token, repo_name)
+    if not metadata.accessible:
+        raise HTTPException(status_code=404, detail="Repository not found or access denied")
+    return metadata
+
+def require_writable_repo(github_token: str, repo_name: str, refresh: bool = False) -> RepoMetadata:
+    """Reject archived, inaccessible or read-only repositories before any write"""
+    metadata = lookup_repo(github_token, repo_name, refresh=refresh)
+    if not metadata.accessible:
+        raise HTTPException(status_code=400, detail="Repository not found or access denied")
+    if metadata.archived:
+        raise HTTPException(status_code=400, detail="Repository is archived")
+    if not metadata.writable:
+        raise HTTPException(status_code=400, detail="Write access to the repository is required")
+    return metadata
+
+@app.post("/api/github/repos/metadata", response_model=RepoMetadataResponse)
+def get_repos_metadata(request: RepoMetadataRequest):
+    """Fetch (or serve cached) metadata for many repositories at once"""
+    if len(request.repos) > 1000:
+        raise HTTPException(status_code=400, detail="At most 1000 repositories per request")
+    try:
+        return {"repos": repo_metadata.get_many(request.github_token, request.repos, refresh=request.refresh)}
+    except RetryableJobError as e:
+        raise github_unavailable(e)
+
+def enqueue_github_job(kind: str, payload: Dict[str, Any], repo_name: str, priority: str) -> Dict[str, Any]:
+    try:
+        job_id = job_queue.enqueue(kind, payload, repo=repo_name, priority=priority)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "status": "queued",
+        "job_id": job_id,
+        "job_url": f"/api/jobs/{job_id}"
+    }
+
+def put_workflow_file(repo_name: str, github_token: str, agent_type: str, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    headers = github_headers(github_token)
+    
+    if agent_type not in AGENT_WORKFLOWS:
+        raise HTTPException(status_code=400, detail=f"Invalid agent type: {agent_type}")
+    
+    workflow_content = encoded_workflow(agent_type, WorkflowOptions.model_validate(options or {}))
+    
+    agent_name = AGENT_WORKFLOWS[agent_type].display_name
+    filename = f"{agent_type.replace('_', '-')}-workflow.yml"
+    url = f"https://api.github.com/repos/{repo_name}/contents/.github/workflows/{filename}"
+    for attempt in range(2):
+        metadata = require_writable_repo(github_token, repo_name, refresh=attempt > 0)
+        existing_sha = metadata.workflow_files.get(filename)
         
         data = {
-            "message": f"Add {agent_name} workflow",
+            "message": f"{'Update' if existing_sha else 'Add'} {agent_name} workflow",
             "content": workflow_content,
-            "branch": "main"
+            "branch": metadata.default_branch or "main"
         }
+        if existing_sha:
+            data["sha"] = existing_sha
         
-        url = f"https://api.github.com/repos/{request.repo_name}/contents/.github/workflows/{filename}"
-        response = requests.put(url, headers=headers, json=data)
+        response = github_session.put(url, headers=headers, json=data)
         
         if response.status_code in [200, 201]:
+            sha = (response.json().get("content") or {}).get("sha")
+            if sha:
+                repo_metadata.note_workflow_file(repo_name, filename, sha)
             return {
                 "status": "success",
-                "workflow_url": f"https://github.com/{request.repo_name}/actions/workflows/{filename}",
+                "workflow_url": f"https://github.com/{repo_name}/actions/workflows/{filename}",
                 "message": f"{agent_name} workflow created successfully"
             }
-        else:
-            raise HTTPException(status_code=400, detail=f"Failed to create workflow: {response.text}")
-            
+        if is_transient_github_error(response):
+            raise RetryableJobError(f"Failed to create workflow: {response.text}")
+        # A stale cached file SHA or branch makes GitHub reject the write with
+        # 409 or 422; retry once with freshly fetched metadata.
+        if response.status_code not in (409, 422):
+            break
+    
+    repo_metadata.invalidate(repo_name)
+    raise HTTPException(status_code=400, detail=f"Failed to create workflow: {response.text}")
+
+@app.post("/api/github/workflows", response_model=Union[WorkflowCreatedResponse, JobQueuedResponse])
+def create_workflow(request: WorkflowRequest):
+    if request.background:
+        return enqueue_github_job(
+            "create_workflow",
+            {
+                "repo_name": request.repo_name,
+                "github_token": request.github_token,
+                "agent_type": request.agent_type,
+                "options": request.options.model_dump(mode="json")
+            },
+            request.repo_name,
+            request.priority,
+        )
+    try:
+        return put_workflow_file(request.repo_name, request.github_token, request.agent_type, request.options.model_dump())
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/github/secrets")
-async def manage_secrets(request: SecretsRequest):
-    try:
-        headers = {
-            "Authorization": f"token {request.github_token}",
-            "Accept": "application/vnd.github.v3+json"
-        }
-        
-        repo_url = f"https://api.github.com/repos/{request.repo_name}"
-        repo_response = requests.get(repo_url, headers=headers)
-        
-        if repo_response.status_code != 200:
-            raise HTTPException(status_code=400, detail="Repository not found or access denied")
-        
-        public_key_url = f"https://api.github.com/repos/{request.repo_name}/actions/secrets/public-key"
-        key_response = requests.get(public_key_url, headers=headers)
-        
-        if key_response.status_code != 200:
-            raise HTTPException(status_code=400, detail="Failed to get repository public key")
-        
-        public_key_data = key_response.json()
-        
-        results = {}
-        for secret_name, secret_value in request.secrets.items():
-            try:
-                from cryptography.hazmat.primitives import serialization, hashes
-                from cryptography.hazmat.primitives.asymmetric import padding, rsa
-                
-                public_key_bytes = base64.b64decode(public_key_data["key"])
-                public_key = serialization.load_der_public_key(public_key_bytes)
-                
-                if isinstance(public_key, rsa.RSAPublicKey):
-                    encrypted_value = public_key.encrypt(
-                        secret_value.encode(),
-                        padding.OAEP(
-                            mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                            algorithm=hashes.SHA256(),
-                            label=None
-                        )
-                    )
-                else:
-                    raise ValueError("Unsupported key type for encryption")
-                
-                encrypted_value_b64 = base64.b64encode(encrypted_value).decode()
-                
-                secret_data = {
-                    "encrypted_value": encrypted_value_b64,
-                    "key_id": public_key_data["key_id"]
-                }
-                
-                secret_url = f"https://api.github.com/repos/{request.repo_name}/actions/secrets/{secret_name}"
-                secret_response = requests.put(secret_url, headers=headers, json=secret_data)
+@lru_cache(maxsize=64)
+def load_public_key(key_b64: str):
+    serialization, hashes, padding, rsa = load_crypto()
+    return serialization.load_der_public_key(base64.b64decode(key_b64))
+
+def encrypt_secret(key_b64: str, secret_value: str) -> str:
+    serialization, hashes, padding, rsa = load_crypto()
+    public_key = load_public_key(key_b64)
+    
+    if isinstance(public_key, rsa.RSAPublicKey):
+        encrypted_value = public_key.encrypt(
+            secret_value.encode(),
+            padding.OAEP(
+                mgf=padding.MGF1(algorithm=hashes.SHA256()),
+                algorithm=hashes.SHA256(),
+                label=None
+            )
+        )
+    else:
+        raise ValueError("Unsupported key type for encryption")
+    
+    return base64.b64encode(encrypted_value).decode()
+
+def upload_secrets(repo_name: str, github_token: str, secrets: Dict[str, str]) -> Dict[str, Any]:
+    headers = github_headers(github_token)
+    
+    require_writable_repo(github_token, repo_name)
+    
+    public_key_url = f"https://api.github.com/repos/{repo_name}/actions/secrets/public-key"
+    key_response = github_session.get(public_key_url, headers=headers)
+    
+    if key_response.status_code != 200:
+        if is_transient_github_error(key_response):
+            raise RetryableJobError("Failed to get repository public key")
+        raise HTTPException(status_code=400, detail="Failed to get repository public key")
+    
+    public_key_data = key_response.json()
+    
+    results = {}
+    for secret_name, secret_value in secrets.items():
+        try:
+            secret_data = {
+                "encrypted_value": encrypt_secret(public_key_data["key"], secret_value),
+                "key_id": public_key_data["key_id"]
+            }
+            
+            secret_url = f"https://api.github.com/repos/{repo_name}/actions/secrets/{secret_name}"
+            secret_response = github_session.put(secret_url, headers=headers, json=secret_data)
+            
+            if secret_response.status_code in [201, 204]:
+                results[secret_name] = "success"
+                target_key = f"repo:{repo_name}"
+                secret_fingerprints.record(target_key, secret_name, secret_fingerprints.fingerprint(target_key, secret_name, secret_value))
+            elif is_transient_github_error(secret_response):
+                raise RetryableJobError(f"Failed to write secret {secret_name}: {secret_response.text}")
+            else:
+                results[secret_name] = f"failed: {secret_response.text}"
                 
-                if secret_response.status_code in [201, 204]:
-                    results[secret_name] = "success"
-                else:
-                    results[secret_name] = f"failed: {secret_response.text}"
-                    
-            except ImportError:
-                results[secret_name] = "failed: cryptography library not available"
-            except Exception as e:
-                results[secret_name] = f"failed: {str(e)}"
-        
-        return {"status": "completed", "results": results}
-        
+        except ImportError:
+            results[secret_name] = "failed: cryptography library not available"
+        except RetryableJobError:
+            raise
+        except requests.RequestException as e:
+            raise RetryableJobError(f"Failed to write secret {secret_name}: {e}")
+        except Exception as e:
+            results[secret_name] = f"failed: {str(e)}"
+    
+    return {"status": "completed", "results": results}
+
+@app.post("/api/github/secrets", response_model=Union[SecretsResponse, JobQueuedResponse])
+def manage_secrets(request: SecretsRequest):
+    if request.background:
+        return enqueue_github_job(
+            "upload_secrets",
+            {"repo_name": request.repo_name, "github_token": request.github_token, "secrets": request.secrets},
+            request.repo_name,
+            request.priority,
+        )
+    try:
+        return upload_secrets(request.repo_name, request.github_token, request.secrets)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/github/runs/{run_id}")
-async def get_workflow_run(run_id: str, github_token: str):
+def list_remote_secrets(base_url: str, headers: Dict[str, str]) -> Dict[str, str]:
+    """Names (upper-cased, as GitHub stores them) and update times of a target's secrets"""
+    remote = {}
+    page = 1
+    while True:
+        response = github_session.get(base_url, headers=headers, params={"per_page": 100, "page": page})
+        if response.status_code != 200:
+            if is_transient_github_error(response):
+                raise RetryableJobError("Failed to list secrets")
+            raise HTTPException(status_code=400, detail="Target not found or access denied")
+        secrets = response.json().get("secrets", [])
+        for secret in secrets:
+            remote[secret["name"].upper()] = secret.get("updated_at")
+        if len(secrets) < 100:
+            return remote
+        page += 1
+
+def sync_secret_target(github_token: str, target: Dict[str, Any], secrets: Dict[str, str], force: bool = False) -> Dict[str, Any]:
+    """Write only the secrets whose value changed since the last push to this target"""
+    target = SecretTarget.model_validate(target)
+    headers = github_headers(github_token)
+    if target.type != "org":
+        require_writable_repo(github_token, target.repo_name)
+    base_url = f"https://api.github.com/{target.api_path}"
+    
+    remote = list_remote_secrets(base_url, headers)
+    recorded = secret_fingerprints.load(target.key)
+    
+    results = {}
+    pending = []
+    for secret_name, secret_value in secrets.items():
+        fingerprint = secret_fingerprints.fingerprint(target.key, secret_name, secret_value, target.settings)
+        if not force and is_unchanged(fingerprint, recorded.get(secret_name), remote.get(secret_name.upper())):
+            results[secret_name] = "skipped"
+        else:
+            pending.append((secret_name, secret_value, fingerprint))
+    
+    if pending:
+        key_response = github_session.get(f"{base_url}/public-key", headers=headers)
+        if key_response.status_code != 200:
+            if is_transient_github_error(key_response):
+                raise RetryableJobError("Failed to get public key")
+            raise HTTPException(status_code=400, detail="Failed to get public key")
+        public_key_data = key_response.json()
+    
+    for secret_name, secret_value, fingerprint in pending:
+        try:
+            secret_data = {
+                "encrypted_value": encrypt_secret(public_key_data["key"], secret_value),
+                "key_id": public_key_data["key_id"]
+            }
+            if target.type == "org":
+                secret_data["visibility"] = target.visibility
+                if target.visibility == "selected":
+                    secret_data["selected_repository_ids"] = target.selected_repository_ids or []
+            
+            secret_response = github_session.put(f"{base_url}/{secret_name}", headers=headers, json=secret_data)
+            
+            if secret_response.status_code in [201, 204]:
+                secret_fingerprints.record(target.key, secret_name, fingerprint)
+                results[secret_name] = "written"
+            elif is_transient_github_error(secret_response):
+                raise RetryableJobError(f"Failed to write secret {secret_name}: {secret_response.text}")
+            else:
+                results[secret_name] = f"failed: {secret_response.text}"
+        except ImportError:
+            results[secret_name] = "failed: cryptography library not available"
+        except RetryableJobError:
+            raise
+        except requests.RequestException as e:
+            raise RetryableJobError(f"Failed to write secret {secret_name}: {e}")
+        except Exception as e:
+            results[secret_name] = f"failed: {str(e)}"
+    
+    statuses = list(results.values())
+    return {
+        "target": target.key,
+        "written": statuses.count("written"),
+        "skipped": statuses.count("skipped"),
+        "failed": sum(1 for status in statuses if status.startswith("failed")),
+        "results": results
+    }
+
+@app.post("/api/github/secrets/sync", response_model=Union[SecretsSyncResponse, JobsQueuedResponse])
+def sync_secrets(request: SecretsSyncRequest):
+    """Sync secrets to many repo, org or environment targets, skipping unchanged values"""
+    if request.background:
+        jobs = [
+            enqueue_github_job(
+                "sync_secrets",
+                {
+                    "github_token": request.github_token,
+                    "target": target.model_dump(),
+                    "secrets": request.secrets,
+                    "force": request.force
+                },
+                target.lock_key,
+                request.priority,
+            )
+            for target in request.targets
+        ]
+        return {"status": "queued", "jobs": jobs}
+    
+    # One batched lookup validates every repository target up front. A
+    # rejected token fails the whole request here; a throttled lookup is
+    # left to each target, which reports it in its own result.
+    try:
+        repo_metadata.get_many(request.github_token, [t.repo_name for t in request.targets if t.type != "org"])
+    except RetryableJobError:
+        pass
+    
+    targets = []
+    for target in request.targets:
+        try:
+            targets.append(sync_secret_target(request.github_token, target.model_dump(), request.secrets, request.force))
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            targets.append({
+                "target": target.key,
+                "written": 0,
+                "skipped": 0,
+                "failed": len(request.secrets),
+                "results": {},
+                "error": detail
+            })
+    
+    return {
+        "status": "completed",
+        "written": sum(t["written"] for t in targets),
+        "skipped": sum(t["skipped"] for t in targets),
+        "failed": sum(t["failed"] for t in targets),
+        "targets": targets
+    }
+
+@app.get("/api/github/runs/{run_id}", response_model=WorkflowRunResponse, response_model_exclude_unset=True)
+def get_workflow_run(run_id: str, github_token: str):
     try:
         headers = {
             "Authorization": f"token {github_token}",
@@ -436,7 +927,7 @@ async def get_workflow_run(run_id: str, github_token: str):
         }
         
         url = f"https://api.github.com/repos/runs/{run_id}"
-        response = requests.get(url, headers=headers)
+        response = github_session.get(url, headers=headers)
         
         if response.status_code == 200:
             run_data = response.json()
@@ -455,38 +946,268 @@ async def get_workflow_run(run_id: str, github_token: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/github/trigger-workflow")
-async def trigger_workflow(request: TriggerWorkflowRequest):
-    try:
-        headers = {
-            "Authorization": f"token {request.github_token}",
-            "Accept": "application/vnd.github.v3+json"
-        }
+@app.get("/api/github/repos/{repo_name:path}/runs/{run_id}/logs", response_class=StreamingResponse)
+def stream_workflow_run_logs(
+    repo_name: str,
+    run_id: int,
+    github_token: str,
+    job: Optional[str] = None,
+    step: Optional[str] = None,
+    tail: Optional[int] = None,
+):
+    """Stream a run's job/step logs, optionally only the last `tail` lines of each file"""
+    if tail is not None and tail <= 0:
+        raise HTTPException(status_code=400, detail="tail must be a positive number of lines")
+    
+    # Cached archives are shared between callers, so check access first.
+    require_readable_repo(github_token, repo_name)
+    zip_path = run_log_cache.get(repo_name, run_id)
+    temporary = False
+    if zip_path is None:
+        headers = github_headers(github_token)
+        run_response = github_session.get(f"https://api.github.com/repos/{repo_name}/actions/runs/{run_id}", headers=headers)
+        if run_response.status_code != 200:
+            raise HTTPException(status_code=404, detail="Run not found or access denied")
         
-        data = {
-            "ref": "main",
-            "inputs": {
-                "task": request.task
-            }
-        }
+        logs_response = github_session.get(
+            f"https://api.github.com/repos/{repo_name}/actions/runs/{run_id}/logs",
+            headers=headers,
+            stream=True,
+        )
+        if logs_response.status_code != 200:
+            logs_response.close()
+            raise HTTPException(status_code=404, detail="Logs not available for this run")
         
-        url = f"https://api.github.com/repos/{request.repo_name}/actions/workflows/codex-cli.yml/dispatches"
-        response = requests.post(url, headers=headers, json=data)
+        download_path = run_log_cache.new_download_path()
+        try:
+            download_to(logs_response.iter_content(chunk_size=64 * 1024), download_path)
+        except Exception:
+            os.remove(download_path)
+            raise
+        finally:
+            logs_response.close()
         
-        if response.status_code == 204:
-            return {
-                "status": "triggered",
-                "run_id": f"triggered-{request.repo_name}-{request.task[:20]}",
-                "message": "Workflow dispatch successful"
-            }
+        # Only completed runs have immutable logs worth caching.
+        if run_response.json().get("status") == "completed":
+            zip_path = run_log_cache.put(repo_name, run_id, download_path)
         else:
-            raise HTTPException(status_code=400, detail=f"Failed to trigger workflow: {response.text}")
-            
+            zip_path, temporary = download_path, True
+    
+    try:
+        names = select_log_files(zip_path, job=job, step=step)
+    except Exception:
+        if temporary:
+            os.remove(zip_path)
+        raise HTTPException(status_code=502, detail="Invalid log archive")
+    if not names:
+        if temporary:
+            os.remove(zip_path)
+        raise HTTPException(status_code=404, detail="No logs match the requested job/step")
+    
+    def content():
+        try:
+            yield from iter_log_lines(zip_path, names, tail=tail)
+        finally:
+            if temporary:
+                os.remove(zip_path)
+    
+    return StreamingResponse(content(), media_type="text/plain; charset=utf-8")
+
+# Workflow files provisioned by this app, keyed to the agent that runs them.
+AGENT_WORKFLOW_FILES = {
+    "codex-workflow.yml": "codex",
+    "codex-cli.yml": "codex",
+    "github-copilot-workflow.yml": "github_copilot",
+    "devin-workflow.yml": "devin",
+    "replit-workflow.yml": "replit"
+}
+
+def list_workflow_runs(repo_name: str, filename: str, headers: Dict[str, str], page: int) -> Optional[List[Dict[str, Any]]]:
+    """One page of a workflow's runs, newest first; None when the workflow does not exist"""
+    response = github_session.get(
+        f"https://api.github.com/repos/{repo_name}/actions/workflows/{filename}/runs",
+        headers=headers,
+        params={"per_page": 100, "page": page}
+    )
+    if response.status_code == 404:
+        return None
+    if response.status_code != 200:
+        if is_transient_github_error(response):
+            raise RetryableJobError(f"Failed to list workflow runs: {response.text}")
+        raise HTTPException(status_code=502, detail=f"Failed to list workflow runs: {response.text}")
+    return response.json().get("workflow_runs", [])
+
+def sync_run_history(repo_name: str, github_token: str) -> Dict[str, Any]:
+    """Record new and updated agent runs, paging only as far back as needed.
+
+    Runs as a background job. The first sync of a workflow backfills its
+    whole run history. Progress is saved after every page, so a backfill
+    interrupted by a GitHub error resumes where it stopped instead of
+    starting over.
+    """
+    headers = github_headers(github_token)
+    # Fresh metadata, so a workflow added since the last lookup is not missed.
+    metadata = repo_metadata.get(github_token, repo_name, refresh=True)
+    if not metadata.accessible:
+        raise HTTPException(status_code=404, detail="Repository not found or access denied")
+    
+    for filename, agent_type in AGENT_WORKFLOW_FILES.items():
+        if filename not in metadata.workflow_files:
+            continue
+        next_page, complete = run_history.backfill_progress(repo_name, filename)
+        
+        # New and still running runs are on the first pages; pages the
+        # backfill has not reached yet are left to it.
+        page, runs = 1, []
+        while complete or page < next_page:
+            runs = list_workflow_runs(repo_name, filename, headers, page)
+            if runs is None:
+                break
+            changed = run_history.record_runs(repo_name, agent_type, runs)
+            if len(runs) < 100:
+                complete = True
+                run_history.save_backfill_progress(repo_name, filename, page + 1, complete)
+                break
+            # Older pages only matter while they may hold unseen or still running runs.
+            oldest_pending = run_history.oldest_pending_created_at(repo_name)
+            if changed == 0 and (oldest_pending is None or runs[-1]["created_at"] <= oldest_pending):
+                break
+            page += 1
+        if runs is None:
+            continue
+        
+        # New runs only push older ones to later pages, so resuming at the
+        # saved page can re-read a few runs but never skips one.
+        page = next_page
+        while not complete:
+            runs = list_workflow_runs(repo_name, filename, headers, page)
+            if runs is None:
+                break
+            run_history.record_runs(repo_name, agent_type, runs)
+            complete = len(runs) < 100
+            page += 1
+            run_history.save_backfill_progress(repo_name, filename, page, complete)
+    
+    run_history.mark_synced(repo_name)
+    return {"status": "synced", "repo": repo_name}
+
+def ensure_run_history(repo_name: str, github_token: str, refresh: bool) -> Dict[str, Any]:
+    """Check the token can see the repository and queue a sync if its history is stale.
+
+    Requests are always answered from the local store; at most one sync per
+    repository waits in the job queue, and clients can poll its job ID.
+    """
+    require_readable_repo(github_token, repo_name)
+    synced_at = run_history.synced_at(repo_name)
+    sync_job_id = None
+    if refresh or synced_at is None or time.time() - synced_at > RUN_HISTORY_SYNC_INTERVAL:
+        # Syncs are keyed apart from the repository's writes so they never delay them.
+        sync_job_id = job_queue.enqueue(
+            "sync_run_history",
+            {"repo_name": repo_name, "github_token": github_token},
+            repo=f"runs:{repo_name.lower()}",
+            priority="interactive" if synced_at is None else "bulk",
+            dedupe=True,
+        )
+    return {"synced_at": synced_at, "sync_job_id": sync_job_id}
+
+@app.get("/api/github/repos/{repo_name:path}/runs", response_model=RunPage)
+def list_repo_runs(
+    repo_name: str,
+    github_token: str,
+    cursor: Optional[int] = None,
+    limit: int = 50,
+    agent_type: Optional[str] = None,
+    refresh: bool = False,
+):
+    """List agent workflow runs for a repository, newest first"""
+    if not 1 <= limit <= 100:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 100")
+    sync = ensure_run_history(repo_name, github_token, refresh)
+    return {**run_history.list_runs(repo_name, cursor=cursor, limit=limit, agent_type=agent_type), **sync}
+
+@app.get("/api/github/repos/{repo_name:path}/runs/stats", response_model=RunStatsResponse)
+def get_repo_run_stats(repo_name: str, github_token: str, refresh: bool = False):
+    """Success rate and p50/p95 duration and queue time per agent type"""
+    sync = ensure_run_history(repo_name, github_token, refresh)
+    return {"repo": repo_name, "agents": run_history.stats(repo_name), **sync}
+
+def dispatch_workflow(repo_name: str, github_token: str, task: str) -> Dict[str, Any]:
+    headers = github_headers(github_token)
+    
+    metadata = require_writable_repo(github_token, repo_name)
+    if "codex-cli.yml" not in metadata.workflow_files:
+        # The cached file list may predate the workflow being added.
+        metadata = require_writable_repo(github_token, repo_name, refresh=True)
+    if "codex-cli.yml" not in metadata.workflow_files:
+        raise HTTPException(status_code=400, detail="Workflow codex-cli.yml not found in repository")
+    
+    data = {
+        "ref": metadata.default_branch or "main",
+        "inputs": {
+            "task": task
+        }
+    }
+    
+    url = f"https://api.github.com/repos/{repo_name}/actions/workflows/codex-cli.yml/dispatches"
+    response = github_session.post(url, headers=headers, json=data)
+    
+    if response.status_code == 204:
+        return {
+            "status": "triggered",
+            "run_id": f"triggered-{repo_name}-{task[:20]}",
+            "message": "Workflow dispatch successful"
+        }
+    elif is_transient_github_error(response):
+        raise RetryableJobError(f"Failed to trigger workflow: {response.text}")
+    else:
+        raise HTTPException(status_code=400, detail=f"Failed to trigger workflow: {response.text}")
+
+@app.post("/api/github/trigger-workflow", response_model=Union[WorkflowTriggeredResponse, JobQueuedResponse])
+def trigger_workflow(request: TriggerWorkflowRequest):
+    if request.background:
+        return enqueue_github_job(
+            "dispatch_workflow",
+            {"repo_name": request.repo_name, "github_token": request.github_token, "task": request.task},
+            request.repo_name,
+            request.priority,
+        )
+    try:
+        return dispatch_workflow(request.repo_name, request.github_token, request.task)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/teams/build")
-async def build_teams_app():
+def run_github_job(func):
+    """Adapt a GitHub helper into a job handler that retries on network errors"""
+    def handler(payload: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return func(**payload)
+        except requests.RequestException as e:
+            raise RetryableJobError(str(e))
+        except HTTPException as e:
+            if e.status_code == 503:
+                raise RetryableJobError(e.detail)
+            raise ValueError(e.detail)
+    return handler
+
+job_queue.register("create_workflow", run_github_job(put_workflow_file))
+job_queue.register("upload_secrets", run_github_job(upload_secrets))
+job_queue.register("sync_secrets", run_github_job(sync_secret_target))
+job_queue.register("dispatch_workflow", run_github_job(dispatch_workflow))
+job_queue.register("sync_run_history", run_github_job(sync_run_history))
+
+@app.get("/api/jobs/{job_id}", response_model=JobStatusResponse)
+def get_job(job_id: str):
+    """Get the status and result of a background job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.post("/api/teams/build", response_model=TeamsBuildResponse)
+def build_teams_app():
     """Build the teams-v2-sdk application"""
     try:
         import subprocess
@@ -522,8 +1243,8 @@ async def build_teams_app():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/teams/package")
-async def package_teams_app():
+@app.post("/api/teams/package", response_model=PackageResponse)
+def package_teams_app():
     """Package the Teams app as a zip file for download"""
     try:
         import subprocess
@@ -600,8 +1321,8 @@ For more details, see the full documentation.
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/teams/download")
-async def download_teams_app():
+@app.get("/api/teams/download", response_class=FileResponse)
+def download_teams_app():
     """Serve the packaged Teams app for download"""
     try:
         import os
@@ -611,7 +1332,7 @@ async def download_teams_app():
         zip_path = os.path.join(teams_sdk_path, "devin-teams-app.zip")
         
         if not os.path.exists(zip_path):
-            await package_teams_app()
+            package_teams_app()
         
         if os.path.exists(zip_path):
             return FileResponse(
@@ -627,8 +1348,8 @@ async def download_teams_app():
 
 teams_app_process = None
 
-@app.post("/api/teams/start")
-async def start_teams_app():
+@app.post("/api/teams/start", response_model=TeamsAppResponse, response_model_exclude_unset=True)
+def start_teams_app():
     """Start the teams-v2-sdk locally for testing"""
     global teams_app_process
     try:
@@ -666,8 +1387,8 @@ async def start_teams_app():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/teams/stop")
-async def stop_teams_app():
+@app.post("/api/teams/stop", response_model=StatusMessageResponse)
+def stop_teams_app():
     """Stop the locally running teams-v2-sdk"""
     global teams_app_process
     try:
@@ -697,7 +1418,7 @@ async def stop_teams_app():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/teams/status")
+@app.get("/api/teams/status", response_model=TeamsAppResponse, response_model_exclude_unset=True)
 async def get_teams_app_status():
     """Get the status of the locally running teams-v2-sdk"""
     global teams_app_process
@@ -716,8 +1437,8 @@ async def get_teams_app_status():
             
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-@app.post("/api/copilot/package")
-async def package_copilot_extension():
+@app.post("/api/copilot/package", response_model=PackageResponse)
+def package_copilot_extension():
     """Package the GitHub Copilot extension as a zip file for download"""
     try:
         import subprocess
@@ -797,8 +1518,8 @@ For support, visit: https://agunblock.com/support
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/copilot/download")
-async def download_copilot_extension():
+@app.get("/api/copilot/download", response_class=FileResponse)
+def download_copilot_extension():
     """Serve the packaged GitHub Copilot extension for download"""
     try:
         import os
@@ -808,7 +1529,7 @@ async def download_copilot_extension():
         zip_path = os.path.join(copilot_extension_path, "agunblock-copilot-extension.zip")
         
         if not os.path.exists(zip_path):
-            await package_copilot_extension()
+            package_copilot_extension()
         
         if os.path.exists(zip_path):
             return FileResponse(
@@ -822,7 +1543,7 @@ async def download_copilot_extension():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/copilot-extension/download")
+@app.get("/api/copilot-extension/download", response_class=FileResponse)
 def download_copilot_extension_chat():
     """Download the AGU Copilot Extension package"""
     import os
@@ -0,0 +1,93 @@
+"""Cache of upstream repository metadata used to validate GitHub writes.
+
+Default branch, the caller's permission, the archived flag and the files in
+``.github/workflows`` are fetched for many repositories at once (the fetch
+function batches them into GraphQL queries) and kept for a TTL. Entries are
+per token, since permissions differ between callers.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+WRITE_PERMISSIONS = {"ADMIN", "MAINTAIN", "WRITE"}
+
+
+class RepoMetadata(BaseModel):
+    repo_name: str
+    accessible: bool
+    default_branch: Optional[str] = None
+    archived: bool = False
+    permission: Optional[str] = None
+    # Workflow file name -> git blob SHA, as the contents API expects for updates.
+    workflow_files: Dict[str, str] = {}
+    fetched_at: float
+
+    @property
+    def writable(self) -> bool:
+        return self.accessible and not self.archived and self.permission in WRITE_PERMISSIONS
+
+
+MetadataFetcher = Callable[[str, List[str]], Dict[str, RepoMetadata]]
+
+
+class RepoMetadataCache:
+    """TTL and size-bounded cache of RepoMetadata keyed by (token, repo)"""
+
+    def __init__(self, fetch: MetadataFetcher, ttl: float = 300.0, batch_size: int = 50, max_entries: int = 10000):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], RepoMetadata]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _token_key(github_token: str) -> str:
+        return hashlib.sha256(github_token.encode()).hexdigest()[:16]
+
+    def get_many(self, github_token: str, repo_names: List[str], refresh: bool = False) -> Dict[str, RepoMetadata]:
+        token_key = self._token_key(github_token)
+        now = time.time()
+        found: Dict[str, RepoMetadata] = {}
+        missing: List[str] = []
+        with self._lock:
+            for repo_name in dict.fromkeys(repo_names):
+                entry = self._entries.get((token_key, repo_name.lower()))
+                if entry is not None and not refresh and now - entry.fetched_at < self.ttl:
+                    self._entries.move_to_end((token_key, repo_name.lower()))
+                    found[repo_name] = entry
+                else:
+                    missing.append(repo_name)
+
+        for i in range(0, len(missing), self.batch_size):
+            fetched = self.fetch(github_token, missing[i:i + self.batch_size])
+            with self._lock:
+                for repo_name, entry in fetched.items():
+                    self._entries[(token_key, repo_name.lower())] = entry
+                    self._entries.move_to_end((token_key, repo_name.lower()))
+                    found[repo_name] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return found
+
+    def get(self, github_token: str, repo_name: str, refresh: bool = False) -> RepoMetadata:
+        return self.get_many(github_token, [repo_name], refresh=refresh)[repo_name]
+
+    def invalidate(self, repo_name: Optional[str] = None) -> None:
+        with self._lock:
+            if repo_name is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[1] == repo_name.lower()]:
+                del self._entries[key]
+
+    def note_workflow_file(self, repo_name: str, filename: str, sha: str) -> None:
+        """Record a workflow file we just wrote, so the next update has its SHA without a refetch"""
+        with self._lock:
+            for key, entry in self._entries.items():
+                if key[1] == repo_name.lower():
+                    entry.workflow_files[filename] = sha
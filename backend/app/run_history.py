@@ -0,0 +1,305 @@
+"""Local history of agent workflow runs with incrementally maintained stats.
+
+Runs observed on GitHub are stored in SQLite so listing them is a single
+indexed query. Repository names are stored lower-cased, as GitHub treats
+them case-insensitively. Per-agent aggregates (success rate, duration and queue time
+distributions) are updated when a run attempt is first seen as completed; a
+re-run replaces the run's earlier attempt in them, so each run is counted
+once and dashboards never need to rescan the history. Durations are kept as
+log-scale histograms, which gives percentiles within about 10% of the exact
+value at a fixed cost per agent type.
+"""
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# Eight buckets per doubling: bucket i holds values up to 2 ** (i / 8) seconds,
+# covering durations up to about twelve days.
+BUCKETS_PER_DOUBLING = 8
+BUCKET_COUNT = 160
+
+# Columns returned by list_runs; the counted_* ones are bookkeeping for the stats.
+RUN_COLUMNS = (
+    "run_id", "agent_type", "status", "conclusion", "created_at", "run_started_at", "updated_at",
+    "duration", "queue_time", "html_url", "run_attempt",
+)
+
+RUN_ATTEMPT_COLUMNS = {
+    "run_attempt": "INTEGER",
+    "counted_attempt": "INTEGER",
+    "counted_success": "INTEGER",
+    "counted_duration": "REAL",
+    "counted_queue_time": "REAL",
+}
+
+
+def _parse_time(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def _bucket(seconds: float) -> int:
+    if seconds <= 1:
+        return 0
+    return min(BUCKET_COUNT - 1, math.ceil(math.log2(seconds) * BUCKETS_PER_DOUBLING))
+
+
+def _percentile(histogram: List[int], fraction: float) -> Optional[float]:
+    total = sum(histogram)
+    if total == 0:
+        return None
+    rank = fraction * total
+    seen = 0
+    for i, count in enumerate(histogram):
+        seen += count
+        if seen >= rank:
+            return round(2 ** (i / BUCKETS_PER_DOUBLING), 1)
+    return None
+
+
+class RunHistory:
+    """SQLite store of agent runs and their per-agent aggregates"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def open(self) -> None:
+        """Open the store and create its tables now rather than on first use"""
+        with self._lock:
+            self._db()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                """CREATE TABLE IF NOT EXISTS runs (
+                       repo TEXT NOT NULL,
+                       run_id INTEGER NOT NULL,
+                       agent_type TEXT NOT NULL,
+                       status TEXT,
+                       conclusion TEXT,
+                       created_at TEXT,
+                       run_started_at TEXT,
+                       updated_at TEXT,
+                       duration REAL,
+                       queue_time REAL,
+                       html_url TEXT,
+                       run_attempt INTEGER,
+                       counted_attempt INTEGER,
+                       counted_success INTEGER,
+                       counted_duration REAL,
+                       counted_queue_time REAL,
+                       PRIMARY KEY (repo, run_id)
+                   );
+                   CREATE INDEX IF NOT EXISTS runs_by_agent ON runs (repo, agent_type, run_id);
+                   CREATE TABLE IF NOT EXISTS run_stats (
+                       repo TEXT NOT NULL,
+                       agent_type TEXT NOT NULL,
+                       completed INTEGER NOT NULL,
+                       succeeded INTEGER NOT NULL,
+                       durations TEXT NOT NULL,
+                       queue_times TEXT NOT NULL,
+                       PRIMARY KEY (repo, agent_type)
+                   );
+                   CREATE TABLE IF NOT EXISTS run_syncs (
+                       repo TEXT PRIMARY KEY,
+                       synced_at REAL NOT NULL
+                   );
+                   CREATE TABLE IF NOT EXISTS run_backfills (
+                       repo TEXT NOT NULL,
+                       workflow TEXT NOT NULL,
+                       next_page INTEGER NOT NULL,
+                       complete INTEGER NOT NULL,
+                       PRIMARY KEY (repo, workflow)
+                   );"""
+            )
+            # Stores created before attempts were tracked lack these columns.
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(runs)")}
+            for column, column_type in RUN_ATTEMPT_COLUMNS.items():
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE runs ADD COLUMN {column} {column_type}")
+            self._conn.commit()
+        return self._conn
+
+    def record_runs(self, repo: str, agent_type: str, runs: List[Dict[str, Any]]) -> int:
+        """Upsert runs from the GitHub API and return how many were new or changed.
+
+        Aggregates are updated only when a run attempt is first seen as
+        completed, so observing the same attempt twice never double counts
+        it. A later attempt (a re-run) replaces the one counted before.
+        """
+        repo = repo.lower()
+        changed = 0
+        with self._lock:
+            db = self._db()
+            for run in runs:
+                previous = db.execute(
+                    """SELECT status, updated_at, counted_attempt, counted_success, counted_duration,
+                              counted_queue_time
+                       FROM runs WHERE repo = ? AND run_id = ?""",
+                    (repo, run["id"]),
+                ).fetchone()
+                if previous is not None and previous[:2] == (run.get("status"), run.get("updated_at")):
+                    continue
+                changed += 1
+
+                created = _parse_time(run.get("created_at"))
+                started = _parse_time(run.get("run_started_at"))
+                updated = _parse_time(run.get("updated_at"))
+                queue_time = started - created if started and created else None
+                duration = None
+                if run.get("status") == "completed" and started and updated:
+                    duration = updated - started
+                attempt = run.get("run_attempt") or 1
+
+                counted = previous[2:] if previous is not None else (None, None, None, None)
+                if run.get("status") == "completed" and (counted[0] is None or attempt > counted[0]):
+                    if counted[0] is not None:
+                        self._update_stats(db, repo, agent_type, bool(counted[1]), counted[2], counted[3], -1)
+                    succeeded = run.get("conclusion") == "success"
+                    self._update_stats(db, repo, agent_type, succeeded, duration, queue_time, 1)
+                    counted = (attempt, int(succeeded), duration, queue_time)
+
+                db.execute(
+                    """INSERT OR REPLACE INTO runs (repo, run_id, agent_type, status, conclusion, created_at,
+                                                    run_started_at, updated_at, duration, queue_time, html_url,
+                                                    run_attempt, counted_attempt, counted_success,
+                                                    counted_duration, counted_queue_time)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (repo, run["id"], agent_type, run.get("status"), run.get("conclusion"), run.get("created_at"),
+                     run.get("run_started_at"), run.get("updated_at"), duration, queue_time, run.get("html_url"),
+                     attempt, *counted),
+                )
+            db.commit()
+        return changed
+
+    def _update_stats(
+        self,
+        db: sqlite3.Connection,
+        repo: str,
+        agent_type: str,
+        succeeded: bool,
+        duration: Optional[float],
+        queue_time: Optional[float],
+        delta: int,
+    ) -> None:
+        """Add (delta 1) or remove (delta -1) one completed run from the aggregates"""
+        row = db.execute(
+            "SELECT completed, succeeded, durations, queue_times FROM run_stats WHERE repo = ? AND agent_type = ?",
+            (repo, agent_type),
+        ).fetchone()
+        if row is None:
+            row = (0, 0, json.dumps([0] * BUCKET_COUNT), json.dumps([0] * BUCKET_COUNT))
+        durations, queue_times = json.loads(row[2]), json.loads(row[3])
+        if duration is not None:
+            durations[_bucket(duration)] += delta
+        if queue_time is not None:
+            queue_times[_bucket(queue_time)] += delta
+        db.execute(
+            "INSERT OR REPLACE INTO run_stats VALUES (?, ?, ?, ?, ?, ?)",
+            (repo, agent_type, row[0] + delta, row[1] + delta * int(succeeded), json.dumps(durations),
+             json.dumps(queue_times)),
+        )
+
+    def oldest_pending_created_at(self, repo: str) -> Optional[str]:
+        repo = repo.lower()
+        with self._lock:
+            row = self._db().execute(
+                "SELECT MIN(created_at) FROM runs WHERE repo = ? AND status != 'completed'",
+                (repo,),
+            ).fetchone()
+        return row[0]
+
+    def list_runs(
+        self,
+        repo: str,
+        cursor: Optional[int] = None,
+        limit: int = 50,
+        agent_type: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Newest-first page of runs; `cursor` is the last run ID of the previous page"""
+        repo = repo.lower()
+        query = f"SELECT {', '.join(RUN_COLUMNS)} FROM runs WHERE repo = ?"
+        params: List[Any] = [repo]
+        if agent_type is not None:
+            query += " AND agent_type = ?"
+            params.append(agent_type)
+        if cursor is not None:
+            query += " AND run_id < ?"
+            params.append(cursor)
+        query += " ORDER BY run_id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        with self._lock:
+            cur = self._db().execute(query, params)
+            columns = [c[0] for c in cur.description]
+            rows = [dict(zip(columns, row)) for row in cur.fetchall()]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = str(rows[-1]["run_id"])
+        return {"runs": rows, "next_cursor": next_cursor}
+
+    def stats(self, repo: str) -> Dict[str, Any]:
+        repo = repo.lower()
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT agent_type, completed, succeeded, durations, queue_times FROM run_stats WHERE repo = ?",
+                (repo,),
+            ).fetchall()
+        stats = {}
+        for agent_type, completed, succeeded, durations, queue_times in rows:
+            durations, queue_times = json.loads(durations), json.loads(queue_times)
+            stats[agent_type] = {
+                "completed_runs": completed,
+                "success_rate": round(succeeded / completed, 4) if completed else None,
+                "duration_p50_seconds": _percentile(durations, 0.5),
+                "duration_p95_seconds": _percentile(durations, 0.95),
+                "queue_time_p50_seconds": _percentile(queue_times, 0.5),
+                "queue_time_p95_seconds": _percentile(queue_times, 0.95),
+            }
+        return stats
+
+    def synced_at(self, repo: str) -> Optional[float]:
+        repo = repo.lower()
+        with self._lock:
+            row = self._db().execute("SELECT synced_at FROM run_syncs WHERE repo = ?", (repo,)).fetchone()
+        return row[0] if row else None
+
+    def backfill_progress(self, repo: str, workflow: str) -> Tuple[int, bool]:
+        """Next page of a workflow's run list to backfill, and whether backfill finished"""
+        repo = repo.lower()
+        with self._lock:
+            row = self._db().execute(
+                "SELECT next_page, complete FROM run_backfills WHERE repo = ? AND workflow = ?",
+                (repo, workflow),
+            ).fetchone()
+        return (row[0], bool(row[1])) if row else (1, False)
+
+    def save_backfill_progress(self, repo: str, workflow: str, next_page: int, complete: bool) -> None:
+        repo = repo.lower()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO run_backfills VALUES (?, ?, ?, ?)",
+                (repo, workflow, next_page, int(complete)),
+            )
+            db.commit()
+
+    def mark_synced(self, repo: str) -> None:
+        repo = repo.lower()
+        with self._lock:
+            db = self._db()
+            db.execute("INSERT OR REPLACE INTO run_syncs VALUES (?, ?)", (repo, time.time()))
+            db.commit()
@@ -0,0 +1,126 @@
+"""Workflow run log archives: on-disk LRU cache and incremental extraction.
+
+GitHub serves run logs as a zip archive. Archives are streamed to disk rather
+than held in memory, and log files are decompressed member by member while
+they are sent to the client. Logs of completed runs never change, so their
+archives are kept in a size-bounded cache directory.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import zipfile
+from collections import deque
+from typing import Iterable, Iterator, List, Optional
+
+CHUNK_SIZE = 64 * 1024
+
+
+class RunLogCache:
+    """Size-bounded directory of log archives, evicted least recently used first"""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, repo_name: str, run_id: int) -> str:
+        # Hashing the pair keeps file names unambiguous: no (repo, run) pair can
+        # map onto another repository's archive.
+        key = hashlib.sha256(f"{repo_name.lower()}\0{int(run_id)}".encode()).hexdigest()
+        return os.path.join(self.directory, f"{key}.zip")
+
+    def get(self, repo_name: str, run_id: int) -> Optional[str]:
+        path = self._path(repo_name, run_id)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def new_download_path(self) -> str:
+        """Temporary file in the cache directory, so a later put() is a rename"""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        os.close(fd)
+        return path
+
+    def put(self, repo_name: str, run_id: int, download_path: str) -> str:
+        path = self._path(repo_name, run_id)
+        os.replace(download_path, path)
+        self.evict()
+        return path
+
+    def evict(self) -> None:
+        with self._lock:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.directory):
+                if not entry.name.endswith(".zip"):
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+
+def download_to(chunks: Iterable[bytes], path: str) -> None:
+    with open(path, "wb") as f:
+        for chunk in chunks:
+            if chunk:
+                f.write(chunk)
+
+
+def select_log_files(zip_path: str, job: Optional[str] = None, step: Optional[str] = None) -> List[str]:
+    """Pick archive members for a job and/or step.
+
+    The archive holds one ``<n>_<job>.txt`` file per job at the top level plus
+    a ``<job>/<n>_<step>.txt`` file per step. Without a step filter the whole
+    job files are used; steps are matched by number or by name.
+    """
+    with zipfile.ZipFile(zip_path) as zf:
+        names = [info.filename for info in zf.infolist() if not info.is_dir()]
+
+    if step is None:
+        selected = [name for name in names if "/" not in name]
+        if job is not None:
+            selected = [name for name in selected if name.split("_", 1)[-1][:-4] == job]
+        return selected
+
+    selected = []
+    for name in names:
+        if "/" not in name:
+            continue
+        job_name, step_file = name.split("/", 1)
+        if job is not None and job_name != job:
+            continue
+        number, _, step_name = step_file[:-4].partition("_")
+        if step in (number, step_name):
+            selected.append(name)
+    return selected
+
+
+def iter_log_lines(zip_path: str, names: List[str], tail: Optional[int] = None) -> Iterator[bytes]:
+    """Decompress the selected members incrementally, optionally keeping only the last lines"""
+    with zipfile.ZipFile(zip_path) as zf:
+        for name in names:
+            if len(names) > 1:
+                yield f"==> {name} <==\n".encode()
+            with zf.open(name) as member:
+                if tail is None:
+                    while True:
+                        chunk = member.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        yield chunk
+                else:
+                    lines = deque(member, maxlen=tail)
+                    yield b"".join(lines)
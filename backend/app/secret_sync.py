@@ -0,0 +1,163 @@
+"""Change detection for secret sync.
+
+For every target/secret pair the app remembers a keyed fingerprint
+(HMAC-SHA256) of the value it last pushed and when it pushed it. The
+plaintext is never stored, and without the fingerprint key the stored
+digests cannot be used to test guesses of a secret value. For organization
+targets the fingerprint also covers the visibility and selected
+repositories. A sync re-uploads a secret only when its fingerprint changed
+or GitHub reports that the secret is missing or was updated after our last
+push.
+"""
+import hashlib
+import hmac
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Literal, Optional, Tuple
+
+from pydantic import BaseModel, model_validator
+
+# GitHub and local clocks may disagree slightly when comparing update times.
+CLOCK_SKEW_SECONDS = 120
+
+
+class FingerprintStore:
+    """SQLite store of keyed fingerprints of the secret values last pushed"""
+
+    def __init__(self, db_path: str, key: Optional[str] = None):
+        self.db_path = db_path
+        self._key = key.encode() if key else None
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def open(self) -> None:
+        """Load the fingerprint key and open the store now rather than on first use"""
+        with self._lock:
+            self._db()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.db_path))
+            os.makedirs(directory, exist_ok=True)
+            if self._key is None:
+                self._key = self._load_or_create_key(os.path.join(directory, "secret-fingerprint.key"))
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS secret_fingerprints (
+                       target TEXT NOT NULL,
+                       name TEXT NOT NULL,
+                       fingerprint TEXT NOT NULL,
+                       pushed_at REAL NOT NULL,
+                       PRIMARY KEY (target, name)
+                   )"""
+            )
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def _load_or_create_key(path: str) -> bytes:
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            key = secrets.token_bytes(32)
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(key)
+            return key
+
+    def fingerprint(self, target: str, name: str, value: str, settings: str = "") -> str:
+        """Keyed digest of a pushed value and of the target settings written with it"""
+        with self._lock:
+            self._db()
+        message = f"{target}\0{name}\0{value}"
+        if settings:
+            message += f"\0{settings}"
+        return hmac.new(self._key, message.encode(), hashlib.sha256).hexdigest()
+
+    def load(self, target: str) -> Dict[str, Tuple[str, float]]:
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT name, fingerprint, pushed_at FROM secret_fingerprints WHERE target = ?",
+                (target,),
+            ).fetchall()
+        return {name: (fingerprint, pushed_at) for name, fingerprint, pushed_at in rows}
+
+    def record(self, target: str, name: str, fingerprint: str) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO secret_fingerprints VALUES (?, ?, ?, ?)",
+                (target, name, fingerprint, time.time()),
+            )
+            db.commit()
+
+
+def is_unchanged(
+    fingerprint: str,
+    recorded: Optional[Tuple[str, float]],
+    remote_updated_at: Optional[str],
+) -> bool:
+    """Whether a push can be skipped: same value, still on GitHub, not changed since"""
+    if recorded is None or remote_updated_at is None:
+        return False
+    recorded_fingerprint, pushed_at = recorded
+    if not hmac.compare_digest(recorded_fingerprint, fingerprint):
+        return False
+    remote = datetime.fromisoformat(remote_updated_at.replace("Z", "+00:00")).timestamp()
+    return remote <= pushed_at + CLOCK_SKEW_SECONDS
+
+
+class SecretTarget(BaseModel):
+    """Where secrets are written: a repository, an organization or a repository environment"""
+
+    type: Literal["repo", "org", "environment"] = "repo"
+    repo_name: Optional[str] = None
+    org: Optional[str] = None
+    environment: Optional[str] = None
+    visibility: Literal["all", "private", "selected"] = "private"
+    selected_repository_ids: Optional[List[int]] = None
+
+    @model_validator(mode="after")
+    def check_fields(self) -> "SecretTarget":
+        if self.type == "org" and not self.org:
+            raise ValueError("org targets require org")
+        if self.type in ("repo", "environment") and not self.repo_name:
+            raise ValueError(f"{self.type} targets require repo_name")
+        if self.type == "environment" and not self.environment:
+            raise ValueError("environment targets require environment")
+        return self
+
+    @property
+    def key(self) -> str:
+        if self.type == "org":
+            return f"org:{self.org}"
+        if self.type == "environment":
+            return f"environment:{self.repo_name}:{self.environment}"
+        return f"repo:{self.repo_name}"
+
+    @property
+    def settings(self) -> str:
+        """Access settings written with each secret; only organization secrets have them"""
+        if self.type != "org":
+            return ""
+        if self.visibility == "selected":
+            return "selected:" + ",".join(str(i) for i in sorted(self.selected_repository_ids or []))
+        return self.visibility
+
+    @property
+    def lock_key(self) -> str:
+        """Job queue serialization key; repo and environment targets share the repo's"""
+        return f"org:{self.org}" if self.type == "org" else self.repo_name
+
+    @property
+    def api_path(self) -> str:
+        if self.type == "org":
+            return f"orgs/{self.org}/actions/secrets"
+        if self.type == "environment":
+            return f"repos/{self.repo_name}/environments/{self.environment}/secrets"
+        return f"repos/{self.repo_name}/actions/secrets"
@@ -0,0 +1,219 @@
+"""Rendering of the agent GitHub Actions workflows.
+
+Each agent is described once (setup, tooling, run step) and rendered with a
+set of performance options: cached tool installs, shallow or sparse
+checkout, a concurrency group that cancels superseded runs of the same task,
+a job timeout and the runner to use. Options are immutable, so rendered workflows are
+memoized per agent and option set and provisioning never re-renders.
+"""
+import base64
+import hashlib
+import json
+import re
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+
+class WorkflowOptions(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    runs_on: str = Field(default="ubuntu-latest", min_length=1)
+    timeout_minutes: int = Field(default=60, ge=1, le=360)
+    # Only a re-dispatch of the same task supersedes a run; different tasks run side by side.
+    concurrency_group: Optional[str] = "${{ github.workflow }}-${{ github.ref }}-${{ github.event.inputs.task }}"
+    cancel_in_progress: bool = True
+    checkout_depth: int = Field(default=1, ge=0)
+    sparse_checkout: Tuple[str, ...] = ()
+    cache_tools: bool = True
+    cache_version: str = Field(default="1", pattern=r"^[A-Za-z0-9._-]+$")
+
+    @field_validator("sparse_checkout")
+    @classmethod
+    def check_sparse_checkout(cls, paths: Tuple[str, ...]) -> Tuple[str, ...]:
+        # Paths are written one per line into a YAML block scalar.
+        for path in paths:
+            if not path or path != path.strip() or "\n" in path or "\r" in path:
+                raise ValueError(f"Invalid sparse checkout path: {path!r}")
+        return paths
+
+
+class AgentWorkflow(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    name: str
+    display_name: str
+    job_id: str
+    setup: str = ""
+    npm_tools: Tuple[str, ...] = ()
+    uses_npx: bool = False
+    run: str
+
+
+AGENT_WORKFLOWS: Dict[str, AgentWorkflow] = {
+    "codex": AgentWorkflow(
+        name="Codex CLI Agent",
+        display_name="Codex CLI",
+        job_id="codex_refactor",
+        npm_tools=("@openai/codex",),
+        run="""      - name: Run Codex agent
+        run: |
+          export AZURE_OPENAI_API_KEY=${{ secrets.AZURE_OPENAI_API_KEY }}
+          export OPENAI_API_KEY=${{ secrets.AZURE_OPENAI_API_KEY }}
+          codex -p azure "${{ github.event.inputs.task }}"
+""",
+    ),
+    "github_copilot": AgentWorkflow(
+        name="GitHub Copilot Agent",
+        display_name="GitHub Copilot",
+        job_id="copilot_task",
+        setup="""      - name: Setup Node.js
+        uses: actions/setup-node@v4
+        with:
+          node-version: '18'
+""",
+        npm_tools=("@githubnext/github-copilot-cli",),
+        run="""      - name: Run GitHub Copilot task
+        env:
+          GITHUB_TOKEN: ${{ secrets.GITHUB_TOKEN }}
+        run: |
+          echo "Running GitHub Copilot with task: ${{ github.event.inputs.task }}"
+          github-copilot-cli "${{ github.event.inputs.task }}"
+""",
+    ),
+    "devin": AgentWorkflow(
+        name="Devin Agent",
+        display_name="Devin",
+        job_id="devin_task",
+        setup="""      - name: Setup Python
+        uses: actions/setup-python@v4
+        with:
+          python-version: '3.11'
+""",
+        run="""      - name: Run Devin agent
+        env:
+          DEVIN_API_KEY: ${{ secrets.DEVIN_API_KEY }}
+        run: |
+          echo "Running Devin with task: ${{ github.event.inputs.task }}"
+          curl -X POST "https://api.devin.ai/v1/sessions" \\
+            -H "Authorization: Bearer $DEVIN_API_KEY" \\
+            -H "Content-Type: application/json" \\
+            -d "{\\"task\\": \\"${{ github.event.inputs.task }}\\", \\"repo_url\\": \\"${{ github.server_url }}/${{ github.repository }}\\"}"
+""",
+    ),
+    "replit": AgentWorkflow(
+        name="Replit Agent",
+        display_name="Replit Agent",
+        job_id="replit_task",
+        setup="""      - name: Setup Node.js
+        uses: actions/setup-node@v4
+        with:
+          node-version: '18'
+""",
+        uses_npx=True,
+        run="""      - name: Run Replit Agent
+        env:
+          REPLIT_TOKEN: ${{ secrets.REPLIT_TOKEN }}
+        run: |
+          echo "Running Replit Agent with task: ${{ github.event.inputs.task }}"
+          npx @replit/agent-cli run --task "${{ github.event.inputs.task }}" --token "$REPLIT_TOKEN"
+""",
+    ),
+}
+
+
+def _scalar(value: str) -> str:
+    """Plain YAML scalar when safe, otherwise a double-quoted one"""
+    if re.fullmatch(r"[A-Za-z0-9._/-]+", value):
+        return value
+    return json.dumps(value)
+
+
+def _checkout_step(options: WorkflowOptions) -> str:
+    step = "      - uses: actions/checkout@v4\n"
+    settings = []
+    if options.checkout_depth != 1:
+        settings.append(f"          fetch-depth: {options.checkout_depth}\n")
+    if options.sparse_checkout:
+        settings.append("          sparse-checkout: |\n")
+        settings.extend(f"            {path}\n" for path in options.sparse_checkout)
+    if settings:
+        step += "        with:\n" + "".join(settings)
+    return step
+
+
+def _tool_steps(agent: AgentWorkflow, options: WorkflowOptions) -> str:
+    cache_npm_tools = bool(agent.npm_tools) and options.cache_tools
+    cache_npx = agent.uses_npx and options.cache_tools
+    steps = ""
+    if cache_npm_tools or cache_npx:
+        # Tools are installed at their latest version, so caches roll over weekly.
+        steps += """      - name: Get tool cache week
+        id: cache-week
+        run: echo "week=$(date -u +%G-%V)" >> "$GITHUB_OUTPUT"
+"""
+    if agent.npm_tools:
+        tools = " ".join(agent.npm_tools)
+        if cache_npm_tools:
+            key = hashlib.sha256(tools.encode()).hexdigest()[:12]
+            steps += f"""      - name: Cache agent tooling
+        id: tool-cache
+        uses: actions/cache@v4
+        with:
+          path: ~/.npm-global
+          key: ${{{{ runner.os }}}}-agent-tools-{key}-v{options.cache_version}-${{{{ steps.cache-week.outputs.week }}}}
+      - name: Install agent tooling
+        if: steps.tool-cache.outputs.cache-hit != 'true'
+        run: npm install -g --prefix ~/.npm-global {tools}
+      - name: Add agent tooling to PATH
+        run: echo "$HOME/.npm-global/bin" >> "$GITHUB_PATH"
+"""
+        else:
+            steps += f"""      - name: Install agent tooling
+        run: npm install -g {tools}
+"""
+    if cache_npx:
+        steps += f"""      - name: Cache npx packages
+        uses: actions/cache@v4
+        with:
+          path: ~/.npm
+          key: ${{{{ runner.os }}}}-agent-npx-v{options.cache_version}-${{{{ steps.cache-week.outputs.week }}}}
+"""
+    return steps
+
+
+@lru_cache(maxsize=256)
+def render_workflow(agent_type: str, options: WorkflowOptions = WorkflowOptions()) -> str:
+    """Render an agent workflow; raises KeyError for unknown agent types"""
+    agent = AGENT_WORKFLOWS[agent_type]
+    workflow = f"""name: {agent.name}
+on:
+  workflow_dispatch:
+    inputs:
+      task:
+        description: 'Task description'
+        required: true
+        type: string
+
+"""
+    if options.concurrency_group:
+        workflow += f"""concurrency:
+  group: {_scalar(options.concurrency_group)}
+  cancel-in-progress: {str(options.cancel_in_progress).lower()}
+
+"""
+    workflow += f"""jobs:
+  {agent.job_id}:
+    runs-on: {_scalar(options.runs_on)}
+    timeout-minutes: {options.timeout_minutes}
+    steps:
+"""
+    workflow += _checkout_step(options) + agent.setup + _tool_steps(agent, options) + agent.run
+    return workflow
+
+
+@lru_cache(maxsize=256)
+def encoded_workflow(agent_type: str, options: WorkflowOptions = WorkflowOptions()) -> str:
+    """Base64 workflow content, as the GitHub contents API expects"""
+    return base64.b64encode(render_workflow(agent_type, options).encode()).decode()
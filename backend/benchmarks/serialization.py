@@ -0,0 +1,79 @@
+"""Per-request JSON serialization cost, before and after the fast response path.
+
+"before" is what FastAPI does for an untyped route: ``jsonable_encoder`` on
+the returned dict, then the stdlib ``json`` encoder in ``JSONResponse``.
+"after" is the current path: validation against the route's response model
+followed by ``FastJSONResponse``, or the pre-serialized body for the static
+catalog. Run from backend/:
+
+    python benchmarks/serialization.py --number 20000
+"""
+import argparse
+import os
+import sys
+import timeit
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app import main
+from app.responses import FastJSONResponse
+
+
+def before(payload: Any) -> Callable[[], bytes]:
+    return lambda: JSONResponse(content=jsonable_encoder(payload)).body
+
+
+def after(model: Any, payload: Any) -> Callable[[], bytes]:
+    adapter = TypeAdapter(model)
+    return lambda: FastJSONResponse(content=adapter.dump_python(adapter.validate_python(payload), mode="json")).body
+
+
+def cases() -> Dict[str, List[Callable[[], bytes]]]:
+    catalog = main.build_catalog_responses()
+    job = {
+        "job_id": "5b4d0929b4384ed8b285474d48281ff8",
+        "kind": "create_workflow",
+        "repo": "octo/repo",
+        "priority": "interactive",
+        "status": "succeeded",
+        "attempts": 1,
+        "result": {"status": "success", "workflow_url": "https://github.com/octo/repo/actions", "message": "ok"},
+        "error": None,
+        "created_at": 1760000000.0,
+        "updated_at": 1760000001.5,
+    }
+    teams_status = {"status": "running", "port": 3978, "devtools_url": "http://localhost:3979/devtools", "process_id": 4242}
+    admission = {group.name: group.stats() for group in main.admission_groups}
+    return {
+        "GET /api/cards": [before(main.cards_data), lambda: catalog["cards"]],
+        "GET /api/cards/{id}": [before(main.cards_data[3]), lambda: catalog["card:4"]],
+        "GET /api/categories": [
+            before(sorted(set(card["category"] for card in main.cards_data))),
+            lambda: catalog["categories"],
+        ],
+        "GET /healthz": [before({"status": "ok"}), after(main.StatusResponse, {"status": "ok"})],
+        "GET /api/jobs/{id}": [before(job), after(main.JobStatusResponse, job)],
+        "GET /api/teams/status": [before(teams_status), after(main.TeamsAppResponse, teams_status)],
+        "GET /api/admission/stats": [before(admission), after(Dict[str, main.AdmissionGroupStats], admission)],
+    }
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'endpoint':<26}{'before (us)':>12}{'after (us)':>12}{'speedup':>10}")
+    for name, (old, new) in cases().items():
+        old_us = min(timeit.repeat(old, number=args.number, repeat=3)) / args.number * 1e6
+        new_us = min(timeit.repeat(new, number=args.number, repeat=3)) / args.number * 1e6
+        print(f"{name:<26}{old_us:>12.2f}{new_us:>12.2f}{old_us / new_us:>9.1f}x")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,95 @@
+"""Measure backend cold start: process launch to first /healthz and /readyz.
+
+Each round starts a fresh uvicorn process (the same command the Dockerfile
+runs), polls both probes and then stops the server. Run from backend/:
+
+    python benchmarks/startup.py --rounds 10
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for(url: str, started: float, timeout: float) -> float:
+    while time.perf_counter() - started < timeout:
+        try:
+            with urllib.request.urlopen(url, timeout=0.5) as response:
+                if response.status == 200:
+                    return time.perf_counter() - started
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.005)
+    raise TimeoutError(f"{url} not ready after {timeout}s")
+
+
+def run_round(timeout: float) -> tuple:
+    port = free_port()
+    with tempfile.TemporaryDirectory() as data_dir:
+        env = dict(
+            os.environ,
+            JOBS_DB_PATH=os.path.join(data_dir, "jobs.sqlite3"),
+            RUN_HISTORY_DB_PATH=os.path.join(data_dir, "run-history.sqlite3"),
+            RUN_LOG_CACHE_DIR=os.path.join(data_dir, "run-logs"),
+            SECRET_FINGERPRINT_DB_PATH=os.path.join(data_dir, "secret-fingerprints.sqlite3"),
+            WARMUP_GITHUB_CONNECTION="false",
+        )
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+            cwd=BACKEND_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            healthy = wait_for(f"http://127.0.0.1:{port}/healthz", started, timeout)
+            ready = wait_for(f"http://127.0.0.1:{port}/readyz", started, timeout)
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+    return healthy, ready
+
+
+def summarize(name: str, samples: list) -> str:
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))]
+    return (
+        f"{name:<10} median {statistics.median(samples) * 1000:7.1f} ms   "
+        f"min {samples[0] * 1000:7.1f} ms   p95 {p95 * 1000:7.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    healthy, ready = [], []
+    for _ in range(args.rounds):
+        h, r = run_round(args.timeout)
+        healthy.append(h)
+        ready.append(r)
+
+    print(f"{args.rounds} cold starts of app.main:app")
+    print(summarize("/healthz", healthy))
+    print(summarize("/readyz", ready))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import base64
+import os
+import tempfile
+import time
+
+import pytest
+
+# Keep the app's stores out of backend/data while the tests import it.
+DATA_DIR = tempfile.mkdtemp(prefix="async-loom-tests-")
+os.environ.setdefault("JOBS_DB_PATH", os.path.join(DATA_DIR, "jobs.sqlite3"))
+os.environ.setdefault("RUN_LOG_CACHE_DIR", os.path.join(DATA_DIR, "run-logs"))
+os.environ.setdefault("RUN_HISTORY_DB_PATH", os.path.join(DATA_DIR, "run-history.sqlite3"))
+os.environ.setdefault("SECRET_FINGERPRINT_DB_PATH", os.path.join(DATA_DIR, "secret-fingerprints.sqlite3"))
+os.environ.setdefault("WARMUP_GITHUB_CONNECTION", "false")
+
+from app import main  # noqa: E402
+from app.repo_metadata import RepoMetadata  # noqa: E402
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, json_data=None, headers=None, text=""):
+        self.status_code = status_code
+        self._json = json_data if json_data is not None else {}
+        self.headers = headers or {}
+        self.text = text
+
+    def json(self):
+        return self._json
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def repos(monkeypatch):
+    """Serve repository metadata from a dict instead of GitHub GraphQL"""
+    known = {}
+
+    def fetch(github_token, repo_names):
+        results = {}
+        for name in repo_names:
+            tokens, fields = known.get(name.lower(), (None, {"accessible": False}))
+            if tokens is not None and github_token not in tokens:
+                fields = {"accessible": False}
+            results[name] = RepoMetadata(repo_name=name, fetched_at=time.time(), **fields)
+        return results
+
+    def add(repo_name, tokens=None, **fields):
+        """Make a repository visible, to every token or only to `tokens`"""
+        fields.setdefault("accessible", True)
+        fields.setdefault("default_branch", "main")
+        fields.setdefault("permission", "WRITE")
+        known[repo_name.lower()] = (tokens, fields)
+
+    main.repo_metadata.invalidate()
+    monkeypatch.setattr(main.repo_metadata, "fetch", fetch)
+    yield add
+    main.repo_metadata.invalidate()
+
+
+@pytest.fixture(scope="session")
+def public_key():
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048).public_key()
+    der = key.public_bytes(serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo)
+    return {"key": base64.b64encode(der).decode(), "key_id": "key-1"}
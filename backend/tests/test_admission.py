@@ -0,0 +1,100 @@
+import asyncio
+import subprocess
+import threading
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.admission import AdmissionControlMiddleware, RouteGroup
+
+
+def make_app(group):
+    app = FastAPI()
+    release = asyncio.Event()
+
+    @app.post("/api/slow")
+    async def slow():
+        await release.wait()
+        return {"status": "done"}
+
+    @app.get("/healthz")
+    async def healthz():
+        return {"status": "ok"}
+
+    app.add_middleware(AdmissionControlMiddleware, groups=[group])
+    return app, release
+
+
+def test_full_queue_gets_429_and_timed_out_wait_gets_503():
+    group = RouteGroup("slow", [("POST", "/api/slow")], limit=1, max_queue=1, max_wait=0.2, retry_after=7)
+    app, release = make_app(group)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.create_task(client.post("/api/slow"))
+            await asyncio.sleep(0.05)
+            second = asyncio.create_task(client.post("/api/slow"))
+            await asyncio.sleep(0.05)
+            third = await client.post("/api/slow")
+            health = await client.get("/healthz")
+            second = await second
+            release.set()
+            return await first, second, third, health
+
+    first, second, third, health = asyncio.run(scenario())
+    assert first.status_code == 200
+    assert third.status_code == 429
+    assert third.headers["retry-after"] == "7"
+    assert second.status_code == 503
+    assert second.headers["retry-after"] == "7"
+    assert health.status_code == 200
+    assert group.stats() == {
+        "limit": 1,
+        "max_queue": 1,
+        "active": 0,
+        "queued": 0,
+        "admitted": 1,
+        "rejected_queue_full": 1,
+        "rejected_timeout": 1,
+    }
+
+
+def test_queued_request_runs_when_a_slot_frees():
+    group = RouteGroup("slow", [("POST", "/api/slow")], limit=1, max_queue=1, max_wait=5, retry_after=1)
+    app, release = make_app(group)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.create_task(client.post("/api/slow"))
+            await asyncio.sleep(0.05)
+            second = asyncio.create_task(client.post("/api/slow"))
+            await asyncio.sleep(0.05)
+            release.set()
+            return await first, await second
+
+    first, second = asyncio.run(scenario())
+    assert (first.status_code, second.status_code) == (200, 200)
+
+
+def test_health_probe_answers_while_a_build_blocks(client, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+
+    def blocking_build(*args, **kwargs):
+        started.set()
+        release.wait(timeout=10)
+        return subprocess.CompletedProcess(args, 0, stdout="built", stderr="")
+
+    monkeypatch.setattr(subprocess, "run", blocking_build)
+    build = threading.Thread(target=client.post, args=("/api/teams/build",))
+    build.start()
+    try:
+        assert started.wait(timeout=5)
+        began = time.time()
+        assert client.get("/healthz").status_code == 200
+        assert time.time() - began < 1
+    finally:
+        release.set()
+        build.join()
@@ -0,0 +1,124 @@
+import time
+
+import pytest
+
+from app.jobs import JobQueue, RetryableJobError
+
+
+def wait_for(queue, job_ids, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if all(queue.get(job_id)["status"] in ("succeeded", "failed") for job_id in job_ids):
+            return
+        time.sleep(0.02)
+    raise AssertionError("jobs did not finish in time")
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), workers=1, backoff_base=0.2, poll_interval=0.05)
+    yield queue
+    queue.stop()
+
+
+def test_interactive_jobs_run_before_bulk_jobs(queue):
+    order = []
+    queue.register("record", lambda payload: order.append(payload["name"]) or {})
+    bulk = queue.enqueue("record", {"name": "bulk"}, "octo/a", "bulk")
+    interactive = queue.enqueue("record", {"name": "interactive"}, "octo/b", "interactive")
+    queue.start()
+    wait_for(queue, [bulk, interactive])
+    assert order == ["interactive", "bulk"]
+
+
+def test_retried_job_holds_back_later_jobs_for_its_repo(queue):
+    order = []
+    failures = {"first": 1}
+
+    def handler(payload):
+        order.append(payload["name"])
+        if failures.get(payload["name"]):
+            failures[payload["name"]] -= 1
+            raise RetryableJobError("GitHub returned 502")
+        return {}
+
+    queue.register("record", handler)
+    first = queue.enqueue("record", {"name": "first"}, "octo/a")
+    second = queue.enqueue("record", {"name": "second"}, "octo/a")
+    other = queue.enqueue("record", {"name": "other"}, "octo/b")
+    queue.start()
+    wait_for(queue, [first, second, other])
+    assert order == ["first", "other", "first", "second"]
+    assert queue.get(first)["attempts"] == 2
+
+
+def test_permanent_failure_is_not_retried_and_drops_the_payload(queue):
+    def handler(payload):
+        raise ValueError("Repository is archived")
+
+    queue.register("fail", handler)
+    job_id = queue.enqueue("fail", {"github_token": "secret"}, "octo/a")
+    queue.start()
+    wait_for(queue, [job_id])
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert job["attempts"] == 1
+    assert job["error"] == "Repository is archived"
+    with queue._lock:
+        row = queue._conn.execute("SELECT payload FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    assert row[0] is None
+
+
+def test_retryable_failure_gives_up_after_max_attempts(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), workers=1, max_attempts=2, backoff_base=0.05, poll_interval=0.05)
+
+    def handler(payload):
+        raise RetryableJobError("rate limited")
+
+    queue.register("fail", handler)
+    job_id = queue.enqueue("fail", {}, "octo/a")
+    queue.start()
+    try:
+        wait_for(queue, [job_id])
+        assert queue.get(job_id)["status"] == "failed"
+        assert queue.get(job_id)["attempts"] == 2
+    finally:
+        queue.stop()
+
+
+def test_enqueue_rejects_unknown_kind_and_priority(queue):
+    queue.register("record", lambda payload: {})
+    with pytest.raises(ValueError):
+        queue.enqueue("missing", {}, "octo/a")
+    with pytest.raises(ValueError):
+        queue.enqueue("record", {}, "octo/a", "urgent")
+
+
+def test_unknown_job_is_404(client):
+    assert client.get("/api/jobs/missing").status_code == 404
+
+
+def test_finished_jobs_are_purged_after_retention(queue):
+    queue.register("record", lambda payload: {})
+    done = queue.enqueue("record", {}, "octo/a")
+    queue.start()
+    wait_for(queue, [done])
+    queue.stop()
+
+    waiting = queue.enqueue("record", {}, "octo/b")
+    with queue._lock:
+        queue._conn.execute("UPDATE jobs SET updated_at = updated_at - 7200")
+        queue._conn.commit()
+    assert queue.purge(3600) == 1
+    assert queue.get(done) is None
+    assert queue.get(waiting)["status"] == "queued"
+
+
+def test_dedupe_reuses_a_queued_job_of_the_same_kind_and_repo(queue):
+    queue.register("sync", lambda payload: {})
+    queue.register("other", lambda payload: {})
+    first = queue.enqueue("sync", {}, "runs:octo/a", dedupe=True)
+    assert queue.enqueue("sync", {}, "runs:octo/a", dedupe=True) == first
+    assert queue.enqueue("sync", {}, "runs:octo/b", dedupe=True) != first
+    assert queue.enqueue("other", {}, "runs:octo/a", dedupe=True) != first
+    assert queue.enqueue("sync", {}, "runs:octo/a") != first
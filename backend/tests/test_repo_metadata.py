@@ -0,0 +1,192 @@
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app import main
+from app.jobs import RetryableJobError
+from app.repo_metadata import RepoMetadata, RepoMetadataCache
+from tests.conftest import FakeResponse
+
+
+def metadata(repo_name, **fields):
+    fields.setdefault("accessible", True)
+    fields.setdefault("permission", "WRITE")
+    fields.setdefault("default_branch", "main")
+    return RepoMetadata(repo_name=repo_name, fetched_at=time.time(), **fields)
+
+
+class RecordingFetch:
+    def __init__(self):
+        self.calls = []
+        self.fields = {}
+
+    def __call__(self, github_token, repo_names):
+        self.calls.append((github_token, list(repo_names)))
+        return {name: metadata(name, **self.fields.get(name, {})) for name in repo_names}
+
+
+def test_cache_batches_lookups_and_keys_entries_by_token():
+    fetch = RecordingFetch()
+    cache = RepoMetadataCache(fetch, ttl=60, batch_size=2)
+    cache.get_many("a", ["octo/1", "octo/2", "octo/3"])
+    assert fetch.calls == [("a", ["octo/1", "octo/2"]), ("a", ["octo/3"])]
+
+    cache.get_many("a", ["octo/1", "OCTO/3"])
+    assert len(fetch.calls) == 2
+    cache.get("b", "octo/1")
+    assert fetch.calls[-1] == ("b", ["octo/1"])
+    cache.get("a", "octo/1", refresh=True)
+    assert fetch.calls[-1] == ("a", ["octo/1"])
+
+
+def test_cache_expires_and_evicts():
+    fetch = RecordingFetch()
+    cache = RepoMetadataCache(fetch, ttl=0, max_entries=2)
+    cache.get("a", "octo/1")
+    cache.get("a", "octo/1")
+    assert len(fetch.calls) == 2
+
+    cache = RepoMetadataCache(fetch, ttl=60, max_entries=2)
+    cache.get_many("a", ["octo/1", "octo/2", "octo/3"])
+    assert len(cache._entries) == 2
+
+
+def test_note_workflow_file_updates_cached_entries():
+    cache = RepoMetadataCache(RecordingFetch(), ttl=60)
+    cache.get("a", "octo/1")
+    cache.note_workflow_file("Octo/1", "codex-workflow.yml", "abc")
+    assert cache.get("a", "octo/1").workflow_files == {"codex-workflow.yml": "abc"}
+
+
+def graphql(monkeypatch, body, status_code=200):
+    calls = []
+
+    def post(url, json=None, **kwargs):
+        calls.append(json)
+        return FakeResponse(status_code, body)
+
+    monkeypatch.setattr(main.github_session, "post", post)
+    return calls
+
+
+def test_fetch_parses_repositories_and_definite_errors(monkeypatch):
+    calls = graphql(monkeypatch, {
+        "data": {
+            "r0": {
+                "isArchived": False,
+                "viewerPermission": "ADMIN",
+                "defaultBranchRef": {"name": "trunk"},
+                "workflows": {"entries": [{"name": "codex-cli.yml", "oid": "sha1"}]},
+            },
+            "r1": None,
+            "r2": None,
+        },
+        "errors": [
+            {"type": "NOT_FOUND", "path": ["r1"], "message": "Could not resolve to a Repository"},
+            {"type": "FORBIDDEN", "path": ["r2"], "message": "Resource not accessible"},
+        ],
+    })
+    results = main.fetch_repo_metadata("token", ["octo/a", "octo/missing", "octo/forbidden", "not-a-repo"])
+    assert len(calls) == 1
+    assert results["octo/a"].default_branch == "trunk"
+    assert results["octo/a"].workflow_files == {"codex-cli.yml": "sha1"}
+    assert results["octo/a"].writable
+    assert not results["octo/missing"].accessible
+    assert not results["octo/forbidden"].accessible
+    assert not results["not-a-repo"].accessible
+
+
+@pytest.mark.parametrize("body", [
+    {"data": None, "errors": [{"type": "RATE_LIMITED", "message": "API rate limit exceeded"}]},
+    {"data": {"r0": None}, "errors": [{"type": "INTERNAL", "path": ["r0"], "message": "Something went wrong"}]},
+])
+def test_fetch_failures_are_retryable_and_not_cached(monkeypatch, body):
+    graphql(monkeypatch, body)
+    cache = RepoMetadataCache(main.fetch_repo_metadata, ttl=60)
+    with pytest.raises(RetryableJobError):
+        cache.get("token", "octo/a")
+    assert not cache._entries
+
+
+def test_fetch_rejected_token(monkeypatch):
+    graphql(monkeypatch, {"message": "Bad credentials"}, status_code=401)
+    with pytest.raises(HTTPException):
+        main.fetch_repo_metadata("token", ["octo/a"])
+
+
+@pytest.fixture
+def stale_metadata(monkeypatch):
+    fetch = RecordingFetch()
+    main.repo_metadata.invalidate()
+    monkeypatch.setattr(main.repo_metadata, "fetch", fetch)
+    yield fetch
+    main.repo_metadata.invalidate()
+
+
+def test_workflow_write_retries_once_with_fresh_metadata(monkeypatch, stale_metadata):
+    stale_metadata.fields["octo/a"] = {"workflow_files": {"codex-workflow.yml": "stale"}}
+    main.repo_metadata.get("token", "octo/a")
+    stale_metadata.fields["octo/a"] = {"workflow_files": {"codex-workflow.yml": "current"}}
+    shas = []
+
+    def put(url, json=None, **kwargs):
+        shas.append(json.get("sha"))
+        if json.get("sha") != "current":
+            return FakeResponse(409, text="sha does not match")
+        return FakeResponse(200, {"content": {"sha": "new"}})
+
+    monkeypatch.setattr(main.github_session, "put", put)
+    assert main.put_workflow_file("octo/a", "token", "codex")["status"] == "success"
+    assert shas == ["stale", "current"]
+    assert main.repo_metadata.get("token", "octo/a").workflow_files["codex-workflow.yml"] == "new"
+
+
+def test_workflow_write_gives_up_after_one_retry(monkeypatch, stale_metadata):
+    puts = []
+    monkeypatch.setattr(
+        main.github_session, "put", lambda url, **kwargs: puts.append(url) or FakeResponse(422, text="Invalid request")
+    )
+    with pytest.raises(HTTPException) as raised:
+        main.put_workflow_file("octo/a", "token", "codex")
+    assert raised.value.status_code == 400
+    assert len(puts) == 2
+
+
+def test_dispatch_refreshes_a_stale_file_list(monkeypatch, stale_metadata):
+    main.repo_metadata.get("token", "octo/a")
+    stale_metadata.fields["octo/a"] = {"workflow_files": {"codex-cli.yml": "sha"}}
+    monkeypatch.setattr(main.github_session, "post", lambda url, **kwargs: FakeResponse(204))
+    assert main.dispatch_workflow("octo/a", "token", "fix the build")["status"] == "triggered"
+    assert len(stale_metadata.calls) == 2
+
+
+def test_dispatch_rejects_a_missing_workflow(stale_metadata):
+    with pytest.raises(HTTPException) as raised:
+        main.dispatch_workflow("octo/a", "token", "fix the build")
+    assert raised.value.detail == "Workflow codex-cli.yml not found in repository"
+
+
+RATE_LIMITED = {"data": None, "errors": [{"type": "RATE_LIMITED", "message": "API rate limit exceeded"}]}
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/api/github/workflows", {"repo_name": "octo/a", "github_token": "token", "task": "t"}),
+    ("/api/github/secrets", {"repo_name": "octo/a", "github_token": "token", "secrets": {"API_KEY": "v"}}),
+    ("/api/github/trigger-workflow", {"repo_name": "octo/a", "github_token": "token", "task": "t"}),
+    ("/api/github/repos/metadata", {"github_token": "token", "repos": ["octo/a"]}),
+])
+def test_rate_limited_lookup_answers_503_with_retry_after(client, monkeypatch, path, body):
+    main.repo_metadata.invalidate()
+    graphql(monkeypatch, RATE_LIMITED)
+    response = client.post(path, json=body)
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(main.GITHUB_UNAVAILABLE_RETRY_AFTER)
+
+
+def test_rate_limited_lookup_keeps_background_jobs_retryable(monkeypatch):
+    main.repo_metadata.invalidate()
+    graphql(monkeypatch, RATE_LIMITED)
+    handler = main.run_github_job(main.put_workflow_file)
+    with pytest.raises(RetryableJobError):
+        handler({"repo_name": "octo/a", "github_token": "token", "agent_type": "codex"})
@@ -0,0 +1,23 @@
+import json
+
+from app import main
+from app.responses import FastJSONResponse, dumps
+
+
+def test_dumps_matches_compact_stdlib_json():
+    content = {"name": "Zoë", "ids": [1, 2.5, None], "ok": True, "nested": {"empty": []}}
+    assert json.loads(dumps(content)) == content
+    assert FastJSONResponse(content=content).body == dumps(content)
+    assert dumps(content) == json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def test_catalog_routes_serve_prebuilt_bodies(client):
+    cards = client.get("/api/cards")
+    assert cards.status_code == 200
+    assert cards.headers["content-type"] == "application/json"
+    assert cards.json() == main.cards_data
+
+    card = main.cards_data[0]
+    assert client.get(f"/api/cards/{card['id']}").json() == card
+    assert client.get("/api/cards/999999").json() == {"error": "Card not found"}
+    assert client.get("/api/categories").json() == sorted({c["category"] for c in main.cards_data})
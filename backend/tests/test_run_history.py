@@ -0,0 +1,158 @@
+import sqlite3
+
+import pytest
+
+from app import main
+from app.jobs import JobQueue, RetryableJobError
+from app.run_history import RunHistory
+from tests.conftest import FakeResponse
+
+
+def make_run(run_id, status="completed", conclusion="success", attempt=1, minutes=10, created="2025-01-01T10:00:00Z"):
+    return {
+        "id": run_id,
+        "status": status,
+        "conclusion": conclusion if status == "completed" else None,
+        "run_attempt": attempt,
+        "created_at": created,
+        "run_started_at": "2025-01-01T10:01:00Z",
+        "updated_at": f"2025-01-01T{10 + minutes // 60:02d}:{1 + minutes % 60:02d}:00Z",
+        "html_url": f"https://github.com/octo/repo/actions/runs/{run_id}",
+    }
+
+
+@pytest.fixture
+def history(tmp_path):
+    return RunHistory(str(tmp_path / "runs.sqlite3"))
+
+
+def test_completed_run_is_counted_once(history):
+    assert history.record_runs("octo/repo", "codex", [make_run(1)]) == 1
+    assert history.record_runs("octo/repo", "codex", [make_run(1)]) == 0
+    stats = history.stats("octo/repo")["codex"]
+    assert stats["completed_runs"] == 1
+    assert stats["success_rate"] == 1.0
+    assert stats["queue_time_p50_seconds"] == pytest.approx(60, rel=0.1)
+    assert stats["duration_p50_seconds"] == pytest.approx(600, rel=0.1)
+
+
+def test_rerun_replaces_the_counted_attempt(history):
+    history.record_runs("octo/repo", "codex", [make_run(1, conclusion="failure")])
+    history.record_runs("octo/repo", "codex", [make_run(1, status="in_progress", attempt=2)])
+    history.record_runs("octo/repo", "codex", [make_run(1, attempt=2, minutes=20)])
+    stats = history.stats("octo/repo")["codex"]
+    assert stats["completed_runs"] == 1
+    assert stats["success_rate"] == 1.0
+    assert stats["duration_p95_seconds"] == pytest.approx(1200, rel=0.1)
+    assert history.list_runs("octo/repo")["runs"][0]["run_attempt"] == 2
+
+
+def test_list_runs_pages_newest_first(history):
+    history.record_runs("octo/repo", "codex", [make_run(i) for i in range(1, 6)])
+    history.record_runs("octo/repo", "devin", [make_run(6)])
+    page = history.list_runs("octo/repo", limit=2, agent_type="codex")
+    assert [run["run_id"] for run in page["runs"]] == [5, 4]
+    page = history.list_runs("octo/repo", cursor=int(page["next_cursor"]), limit=10, agent_type="codex")
+    assert [run["run_id"] for run in page["runs"]] == [3, 2, 1]
+    assert page["next_cursor"] is None
+
+
+def test_store_without_attempt_columns_is_upgraded(tmp_path):
+    path = str(tmp_path / "runs.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        """CREATE TABLE runs (repo TEXT NOT NULL, run_id INTEGER NOT NULL, agent_type TEXT NOT NULL,
+                              status TEXT, conclusion TEXT, created_at TEXT, run_started_at TEXT,
+                              updated_at TEXT, duration REAL, queue_time REAL, html_url TEXT,
+                              PRIMARY KEY (repo, run_id))"""
+    )
+    conn.commit()
+    conn.close()
+    history = RunHistory(path)
+    history.record_runs("octo/repo", "codex", [make_run(1)])
+    assert history.stats("octo/repo")["codex"]["completed_runs"] == 1
+
+
+def test_repository_names_are_case_insensitive(history):
+    history.record_runs("Octo/Repo", "codex", [make_run(1)])
+    history.mark_synced("OCTO/REPO")
+    assert [run["run_id"] for run in history.list_runs("octo/repo")["runs"]] == [1]
+    assert history.stats("octo/repo")["codex"]["completed_runs"] == 1
+    assert history.synced_at("octo/repo") is not None
+
+
+class FakeRunsApi:
+    """GitHub run listing for codex-workflow.yml"""
+
+    def __init__(self, count, fail_pages=()):
+        self.runs = [make_run(run_id) for run_id in range(count, 0, -1)]
+        self.fail_pages = set(fail_pages)
+        self.requested = []
+
+    def get(self, url, params=None, **kwargs):
+        assert "/workflows/codex-workflow.yml/" in url, f"unexpected GitHub call: {url}"
+        page = params["page"]
+        self.requested.append(page)
+        if page in self.fail_pages:
+            self.fail_pages.discard(page)
+            return FakeResponse(502, text="Bad Gateway")
+        start = (page - 1) * params["per_page"]
+        return FakeResponse(200, {"workflow_runs": self.runs[start:start + params["per_page"]]})
+
+
+@pytest.fixture
+def runs_api(tmp_path, monkeypatch, repos):
+    monkeypatch.setattr(main, "run_history", RunHistory(str(tmp_path / "runs.sqlite3")))
+    monkeypatch.setattr(main, "job_queue", JobQueue(str(tmp_path / "jobs.sqlite3")))
+    main.job_queue.register("sync_run_history", lambda payload: {})
+    # Only codex-workflow.yml exists, so no other workflow file is listed.
+    repos("octo/repo", tokens={"member"}, workflow_files={"codex-workflow.yml": "sha"})
+
+    def install(api):
+        monkeypatch.setattr(main.github_session, "get", api.get)
+        return api
+
+    return install
+
+
+def test_backfill_resumes_after_a_failed_page(runs_api):
+    api = runs_api(FakeRunsApi(350, fail_pages={3}))
+    with pytest.raises(RetryableJobError):
+        main.sync_run_history("octo/repo", "member")
+    assert api.requested == [1, 2, 3]
+    assert main.run_history.synced_at("octo/repo") is None
+
+    api.requested.clear()
+    assert main.sync_run_history("octo/repo", "member") == {"status": "synced", "repo": "octo/repo"}
+    assert main.run_history.stats("octo/repo")["codex"]["completed_runs"] == 350
+    # Pages 1-2 are checked for new runs, then the backfill resumes at page 3.
+    assert api.requested == [1, 3, 4]
+
+
+def test_history_is_served_from_the_store_and_synced_in_the_background(client, runs_api):
+    runs_api(FakeRunsApi(0))
+    main.run_history.record_runs("octo/repo", "codex", [make_run(1)])
+
+    first = client.get("/api/github/repos/Octo/Repo/runs", params={"github_token": "member"}).json()
+    assert [run["run_id"] for run in first["runs"]] == [1]
+    assert first["synced_at"] is None
+    assert first["sync_job_id"] is not None
+    assert main.job_queue.get(first["sync_job_id"])["repo"] == "runs:octo/repo"
+
+    # A sync already waiting in the queue is reused.
+    stats = client.get("/api/github/repos/octo/repo/runs/stats", params={"github_token": "member"}).json()
+    assert stats["agents"]["codex"]["completed_runs"] == 1
+    assert stats["sync_job_id"] == first["sync_job_id"]
+
+    main.run_history.mark_synced("octo/repo")
+    fresh = client.get("/api/github/repos/octo/repo/runs", params={"github_token": "member"}).json()
+    assert fresh["sync_job_id"] is None
+    assert fresh["synced_at"] is not None
+
+
+def test_history_is_not_served_to_a_token_without_access(client, runs_api):
+    runs_api(FakeRunsApi(5))
+    assert client.get("/api/github/repos/octo/repo/runs", params={"github_token": "member"}).status_code == 200
+
+    for path in ("/api/github/repos/octo/repo/runs", "/api/github/repos/octo/repo/runs/stats"):
+        assert client.get(path, params={"github_token": "outsider"}).status_code == 404
@@ -0,0 +1,138 @@
+import io
+import os
+import zipfile
+
+import pytest
+
+from app import main
+from app.run_logs import RunLogCache, iter_log_lines, select_log_files
+from tests.conftest import FakeResponse
+
+
+def make_archive(path):
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("0_build.txt", "build 1\nbuild 2\nbuild 3\n")
+        zf.writestr("1_test.txt", "test 1\ntest 2\n")
+        zf.writestr("build/1_Set up job.txt", "setup\n")
+        zf.writestr("build/2_Run agent.txt", "agent 1\nagent 2\n")
+    return path
+
+
+def test_select_log_files_by_job_and_step(tmp_path):
+    archive = make_archive(str(tmp_path / "logs.zip"))
+    assert select_log_files(archive) == ["0_build.txt", "1_test.txt"]
+    assert select_log_files(archive, job="test") == ["1_test.txt"]
+    assert select_log_files(archive, job="build", step="2") == ["build/2_Run agent.txt"]
+    assert select_log_files(archive, step="Set up job") == ["build/1_Set up job.txt"]
+
+
+def test_iter_log_lines_tail(tmp_path):
+    archive = make_archive(str(tmp_path / "logs.zip"))
+    assert b"".join(iter_log_lines(archive, ["0_build.txt"], tail=2)) == b"build 2\nbuild 3\n"
+    combined = b"".join(iter_log_lines(archive, ["0_build.txt", "1_test.txt"]))
+    assert combined.startswith(b"==> 0_build.txt <==\n")
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = RunLogCache(str(tmp_path / "cache"), max_bytes=250)
+    for run_id in (1, 2):
+        download = cache.new_download_path()
+        with open(download, "wb") as f:
+            f.write(b"x" * 100)
+        cache.put("octo/repo", run_id, download)
+    os.utime(cache._path("octo/repo", 1), (0, 0))
+    os.utime(cache._path("octo/repo", 2), (1, 1))
+    cache.get("octo/repo", 1)
+
+    download = cache.new_download_path()
+    with open(download, "wb") as f:
+        f.write(b"x" * 100)
+    cache.put("octo/repo", 3, download)
+    assert cache.get("octo/repo", 2) is None
+    assert cache.get("octo/repo", 1) is not None
+    assert cache.get("octo/repo", 3) is not None
+
+
+@pytest.fixture
+def cached_logs(tmp_path, monkeypatch):
+    cache = RunLogCache(str(tmp_path / "run-logs"), max_bytes=1024 * 1024)
+    monkeypatch.setattr(main, "run_log_cache", cache)
+    download = cache.new_download_path()
+    make_archive(download)
+    cache.put("octo/private", 42, download)
+
+    def github_get(url, **kwargs):
+        raise AssertionError(f"unexpected GitHub call: {url}")
+
+    monkeypatch.setattr(main.github_session, "get", github_get)
+    return cache
+
+
+def test_cached_logs_are_served_to_a_token_with_access(client, repos, cached_logs):
+    repos("octo/private", tokens={"member"})
+    response = client.get(
+        "/api/github/repos/octo/private/runs/42/logs",
+        params={"github_token": "member", "job": "test"},
+    )
+    assert response.status_code == 200
+    assert response.content == b"test 1\ntest 2\n"
+
+
+def test_cached_logs_are_not_served_to_a_token_without_access(client, repos, cached_logs):
+    repos("octo/private", tokens={"member"})
+    response = client.get(
+        "/api/github/repos/octo/private/runs/42/logs",
+        params={"github_token": "outsider"},
+    )
+    assert response.status_code == 404
+
+
+def test_cache_keys_do_not_collide_across_repositories(client, repos, tmp_path, monkeypatch):
+    cache = RunLogCache(str(tmp_path / "run-logs"), max_bytes=1024 * 1024)
+    monkeypatch.setattr(main, "run_log_cache", cache)
+    download = cache.new_download_path()
+    make_archive(download)
+    cache.put("octo/repo-1", 2, download)
+    assert cache._path("octo/repo", 12) != cache._path("octo/repo-1", 2)
+    assert cache._path("Octo/Repo-1", 2) == cache._path("octo/repo-1", 2)
+
+    repos("octo/repo", tokens={"member"})
+    repos("octo/repo-1", tokens={"insider"})
+
+    def github_get(url, **kwargs):
+        return FakeResponse(404)
+
+    monkeypatch.setattr(main.github_session, "get", github_get)
+    response = client.get("/api/github/repos/octo/repo/runs/1-2/logs", params={"github_token": "member"})
+    assert response.status_code == 422
+    response = client.get("/api/github/repos/octo/repo/runs/12/logs", params={"github_token": "member"})
+    assert response.status_code == 404
+    response = client.get("/api/github/repos/octo/repo-1/runs/2/logs", params={"github_token": "insider"})
+    assert response.status_code == 200
+
+
+def test_uncached_logs_of_a_running_run_are_not_kept(client, repos, tmp_path, monkeypatch):
+    cache = RunLogCache(str(tmp_path / "run-logs"), max_bytes=1024 * 1024)
+    monkeypatch.setattr(main, "run_log_cache", cache)
+    repos("octo/repo")
+    archive = io.BytesIO()
+    make_archive(archive)
+
+    class Logs(FakeResponse):
+        def iter_content(self, chunk_size):
+            yield archive.getvalue()
+
+        def close(self):
+            pass
+
+    def github_get(url, **kwargs):
+        if url.endswith("/logs"):
+            return Logs(200)
+        return FakeResponse(200, {"status": "in_progress"})
+
+    monkeypatch.setattr(main.github_session, "get", github_get)
+    response = client.get("/api/github/repos/octo/repo/runs/7/logs", params={"github_token": "t", "tail": 1})
+    assert response.status_code == 200
+    assert b"build 3\n" in response.content
+    assert cache.get("octo/repo", 7) is None
+    assert os.listdir(cache.directory) == []
@@ -0,0 +1,156 @@
+import os
+import stat
+import time
+from datetime import datetime, timezone
+
+import pytest
+from pydantic import ValidationError
+
+from app import main
+from app.jobs import RetryableJobError
+from app.secret_sync import FingerprintStore, SecretTarget, is_unchanged
+from tests.conftest import FakeResponse
+
+
+def iso(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def test_key_file_is_private_and_fingerprints_are_keyed(tmp_path):
+    store = FingerprintStore(str(tmp_path / "fingerprints.sqlite3"))
+    fingerprint = store.fingerprint("repo:octo/a", "API_KEY", "value")
+    assert stat.S_IMODE(os.stat(tmp_path / "secret-fingerprint.key").st_mode) == 0o600
+    assert fingerprint == FingerprintStore(str(tmp_path / "fingerprints.sqlite3")).fingerprint(
+        "repo:octo/a", "API_KEY", "value"
+    )
+    assert fingerprint != FingerprintStore(str(tmp_path / "other.sqlite3"), key="other").fingerprint(
+        "repo:octo/a", "API_KEY", "value"
+    )
+    assert fingerprint != store.fingerprint("repo:octo/b", "API_KEY", "value")
+    assert fingerprint != store.fingerprint("repo:octo/a", "API_KEY", "value", "private")
+
+
+def test_is_unchanged():
+    pushed_at = time.time()
+    assert is_unchanged("fp", ("fp", pushed_at), iso(pushed_at))
+    assert not is_unchanged("fp", None, iso(pushed_at))
+    assert not is_unchanged("fp", ("fp", pushed_at), None)
+    assert not is_unchanged("new", ("fp", pushed_at), iso(pushed_at))
+    assert not is_unchanged("fp", ("fp", pushed_at), iso(pushed_at + 3600))
+
+
+def test_target_validation_and_settings():
+    with pytest.raises(ValidationError):
+        SecretTarget(type="org")
+    with pytest.raises(ValidationError):
+        SecretTarget(type="environment", repo_name="octo/a")
+    assert SecretTarget(repo_name="octo/a").settings == ""
+    assert SecretTarget(type="org", org="octo", visibility="all").settings == "all"
+    assert (
+        SecretTarget(type="org", org="octo", visibility="selected", selected_repository_ids=[3, 1]).settings
+        == SecretTarget(type="org", org="octo", visibility="selected", selected_repository_ids=[1, 3]).settings
+    )
+
+
+class FakeSecretsApi:
+    def __init__(self, public_key):
+        self.public_key = public_key
+        self.remote = {}
+        self.writes = []
+        self.put_status = 201
+
+    def get(self, url, params=None, **kwargs):
+        if url.endswith("/public-key"):
+            return FakeResponse(200, self.public_key)
+        secrets = [{"name": name, "updated_at": updated_at} for name, updated_at in self.remote.items()]
+        return FakeResponse(200, {"secrets": secrets})
+
+    def put(self, url, json=None, **kwargs):
+        if self.put_status != 201:
+            return FakeResponse(self.put_status, text="Service Unavailable")
+        name = url.rsplit("/", 1)[-1]
+        self.writes.append((name, json.get("visibility"), json.get("selected_repository_ids")))
+        self.remote[name.upper()] = iso(time.time())
+        return FakeResponse(201)
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch, repos, public_key):
+    monkeypatch.setattr(main, "secret_fingerprints", FingerprintStore(str(tmp_path / "fingerprints.sqlite3")))
+    repos("octo/a")
+    api = FakeSecretsApi(public_key)
+    monkeypatch.setattr(main.github_session, "get", api.get)
+    monkeypatch.setattr(main.github_session, "put", api.put)
+    return api
+
+
+def test_unchanged_secrets_are_skipped(api):
+    target = {"type": "repo", "repo_name": "octo/a"}
+    first = main.sync_secret_target("token", target, {"API_KEY": "one", "OTHER": "two"})
+    assert (first["written"], first["skipped"]) == (2, 0)
+
+    second = main.sync_secret_target("token", target, {"API_KEY": "one", "OTHER": "changed"})
+    assert second["results"] == {"API_KEY": "skipped", "OTHER": "written"}
+
+    forced = main.sync_secret_target("token", target, {"API_KEY": "one"}, force=True)
+    assert forced["results"] == {"API_KEY": "written"}
+
+
+def test_secret_deleted_or_edited_on_github_is_rewritten(api):
+    target = {"type": "repo", "repo_name": "octo/a"}
+    main.sync_secret_target("token", target, {"API_KEY": "one", "OTHER": "two"})
+    del api.remote["API_KEY"]
+    api.remote["OTHER"] = iso(time.time() + 3600)
+    result = main.sync_secret_target("token", target, {"API_KEY": "one", "OTHER": "two"})
+    assert result["results"] == {"API_KEY": "written", "OTHER": "written"}
+
+
+def test_org_visibility_changes_are_written(api):
+    target = {"type": "org", "org": "octo", "visibility": "selected", "selected_repository_ids": [2, 1]}
+    main.sync_secret_target("token", target, {"API_KEY": "one"})
+
+    reordered = dict(target, selected_repository_ids=[1, 2])
+    assert main.sync_secret_target("token", reordered, {"API_KEY": "one"})["results"] == {"API_KEY": "skipped"}
+
+    widened = dict(target, selected_repository_ids=[1, 2, 3])
+    assert main.sync_secret_target("token", widened, {"API_KEY": "one"})["results"] == {"API_KEY": "written"}
+
+    public = {"type": "org", "org": "octo", "visibility": "all"}
+    assert main.sync_secret_target("token", public, {"API_KEY": "one"})["results"] == {"API_KEY": "written"}
+    assert api.writes[-2:] == [("API_KEY", "selected", [1, 2, 3]), ("API_KEY", "all", None)]
+
+
+def test_transient_write_failure_is_retryable(api):
+    api.put_status = 503
+    with pytest.raises(RetryableJobError):
+        main.sync_secret_target("token", {"type": "repo", "repo_name": "octo/a"}, {"API_KEY": "one"})
+
+
+def test_sync_route_reports_each_target(client, api):
+    response = client.post("/api/github/secrets/sync", json={
+        "github_token": "token",
+        "secrets": {"API_KEY": "one"},
+        "targets": [{"type": "repo", "repo_name": "octo/a"}, {"type": "repo", "repo_name": "octo/missing"}],
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["written"], body["failed"]) == (1, 1)
+    assert body["targets"][1]["error"] == "Repository not found or access denied"
+
+
+def test_sync_route_fails_once_for_a_rejected_token(client, monkeypatch):
+    main.repo_metadata.invalidate()
+    posts = []
+
+    def post(url, **kwargs):
+        posts.append(url)
+        return FakeResponse(401, {"message": "Bad credentials"}, text="Bad credentials")
+
+    monkeypatch.setattr(main.github_session, "post", post)
+    response = client.post("/api/github/secrets/sync", json={
+        "github_token": "revoked",
+        "secrets": {"API_KEY": "one"},
+        "targets": [{"type": "repo", "repo_name": "octo/a"}, {"type": "repo", "repo_name": "octo/b"}],
+    })
+    assert response.status_code == 400
+    assert len(posts) == 1
@@ -0,0 +1,34 @@
+import pytest
+import requests
+
+from app import main
+from app.jobs import RetryableJobError
+from tests.conftest import FakeResponse
+
+
+def test_transient_secret_write_failure_is_retryable(monkeypatch, repos, public_key):
+    repos("octo/transient")
+    monkeypatch.setattr(main.github_session, "get", lambda url, **kwargs: FakeResponse(200, public_key))
+    monkeypatch.setattr(main.github_session, "put", lambda url, **kwargs: FakeResponse(502, text="Bad Gateway"))
+    with pytest.raises(RetryableJobError):
+        main.upload_secrets("octo/transient", "token", {"API_KEY": "value"})
+
+
+def test_secret_write_connection_error_is_retryable(monkeypatch, repos, public_key):
+    repos("octo/offline")
+
+    def put(url, **kwargs):
+        raise requests.ConnectionError("connection reset")
+
+    monkeypatch.setattr(main.github_session, "get", lambda url, **kwargs: FakeResponse(200, public_key))
+    monkeypatch.setattr(main.github_session, "put", put)
+    with pytest.raises(RetryableJobError):
+        main.upload_secrets("octo/offline", "token", {"API_KEY": "value"})
+
+
+def test_rejected_secret_write_is_reported_per_secret(monkeypatch, repos, public_key):
+    repos("octo/rejected")
+    monkeypatch.setattr(main.github_session, "get", lambda url, **kwargs: FakeResponse(200, public_key))
+    monkeypatch.setattr(main.github_session, "put", lambda url, **kwargs: FakeResponse(422, text="Invalid name"))
+    result = main.upload_secrets("octo/rejected", "token", {"API_KEY": "value"})
+    assert result["results"] == {"API_KEY": "failed: Invalid name"}
